@@ -0,0 +1,69 @@
+"""
+Time validating a set of generated config files again after one line of one
+of them has changed: without a cache, with the ``ValidationCache`` the first
+run filled in memory, and with a new ``ValidationCache`` reading the outcomes
+the first run stored in its directory (as another process would).
+
+    python benchmarks/bench_cache.py [files] [sections] [keys]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, 'benchmarks'))
+
+from bench_validate import generated
+from configobj import ConfigObj, ValidationCache
+from validate import Validator
+
+
+def main(files=50, sections=100, keys=20):
+    spec, lines = generated(sections, keys)
+    configspec = ConfigObj(spec, _inspec=True)
+    vtor = Validator()
+    directory = tempfile.mkdtemp()
+    try:
+        names = []
+        for i in range(files):
+            name = os.path.join(directory, 'config%d.ini' % i)
+            with open(name, 'w') as h:
+                h.write('\n'.join(lines[1:]))
+            names.append(name)
+        configs = [ConfigObj(name, configspec=configspec) for name in names]
+
+        def run(cache):
+            start = time.perf_counter()
+            for config in configs:
+                config.reload()
+            loaded = time.perf_counter()
+            for config in configs:
+                assert config.validate(vtor, cache=cache) is True
+            end = time.perf_counter()
+            return loaded - start, end - loaded
+
+        cache = ValidationCache(os.path.join(directory, 'cache'))
+        run(cache)
+        # one line of one file changes
+        with open(names[0], 'w') as h:
+            h.write('\n'.join(lines[1:]).replace('key0 = 42', 'key0 = 43', 1))
+
+        print('%d files, %d sections, %d keys each' % (files, sections, keys))
+        print('%-24s %12s %12s' % ('', 'reload (ms)', 'validate (ms)'))
+        for label, make in (('no cache', lambda: None),
+                            ('cache in memory', lambda: cache),
+                            ('cache from files', lambda: ValidationCache(
+                                os.path.join(directory, 'cache')))):
+            best = min([run(make()) for i in range(3)],
+                       key=lambda times: times[1])
+            print('%-24s %12.1f %12.1f' % (label, best[0] * 1000,
+                                            best[1] * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,71 @@
+"""
+Compare parsing and writing with and without ``keep_comments``, on the
+functional test fixture and on a generated, heavily commented config.
+
+    python benchmarks/bench_lean.py [sections] [keys]
+"""
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from configobj import ConfigObj
+
+
+def generated(sections, keys):
+    lines = ['# generated benchmark config', '#', '# with a header', '']
+    for i in range(sections):
+        lines.append('# section %d' % i)
+        lines.append('# describes something')
+        lines.append('[section%d] # inline' % i)
+        for j in range(keys):
+            lines.append('    # the key%d setting' % j)
+            lines.append('    key%d = value%d # inline comment' % (j, j))
+    lines.append('# the end')
+    return '\n'.join(lines).encode('ascii')
+
+
+def memory(data, keep_comments):
+    """Bytes still allocated by a parsed config."""
+    tracemalloc.start()
+    try:
+        config = ConfigObj(io.BytesIO(data), keep_comments=keep_comments)
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name, data, number):
+    print(name)
+    print('%-16s %12s %12s %12s' % ('keep_comments', 'parse (ms)',
+                                    'write (ms)', 'memory (KB)'))
+    for keep_comments in (True, False):
+        parse = lambda: ConfigObj(io.BytesIO(data),
+                                  keep_comments=keep_comments)
+        config = parse()
+        parse_time = min(timeit.repeat(parse, number=number, repeat=3))
+        write_time = min(timeit.repeat(config.write, number=number,
+                                       repeat=3))
+        print('%-16s %12.3f %12.3f %12.1f' % (
+            keep_comments, parse_time / number * 1000,
+            write_time / number * 1000,
+            memory(data, keep_comments) / 1024.0))
+    print('')
+
+
+def main(sections=500, keys=20):
+    fixture = os.path.join(HERE, 'functionaltests', 'conf.ini')
+    h = open(fixture, 'rb')
+    data = h.read()
+    h.close()
+    measure('functionaltests/conf.ini', data, 1000)
+    measure('generated: %d sections, %d keys each' % (sections, keys),
+            generated(sections, keys), 5)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,57 @@
+"""
+Compare the size and speed of ``ConfigObj.dumps`` with pickling every
+section attribute (what pickle did before ``ConfigObj.__reduce__`` used
+``dumps``).
+
+    python benchmarks/bench_pickle.py [sections] [keys]
+"""
+import io
+import os
+import pickle
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configobj import ConfigObj, Section
+
+
+def make_config(sections, keys):
+    lines = ['# benchmark config', '']
+    for i in range(sections):
+        lines.append('[section%d]' % i)
+        lines.append('    # section comment')
+        for j in range(keys):
+            lines.append('    key%d = value%d # inline' % (j, j % 10))
+        lines.append('    [[sub]]')
+        lines.append('        name = %(key0)s')
+    return ConfigObj(io.BytesIO('\n'.join(lines).encode('ascii')))
+
+
+def legacy_dumps(config):
+    return pickle.dumps(Section.__reduce__(config),
+                        pickle.HIGHEST_PROTOCOL)
+
+
+def main(sections=200, keys=20, number=20):
+    config = make_config(sections, keys)
+    candidates = [
+        ('legacy pickle', lambda: legacy_dumps(config), pickle.loads),
+        ('dumps', config.dumps, ConfigObj.loads),
+        ('pickle (dumps)',
+         lambda: pickle.dumps(config, pickle.HIGHEST_PROTOCOL),
+         pickle.loads),
+    ]
+    print('%d sections, %d keys each' % (sections, keys))
+    print('%-16s %10s %12s %12s' % ('', 'bytes', 'dump (ms)', 'load (ms)'))
+    for name, dump, load in candidates:
+        data = dump()
+        dump_time = timeit.timeit(dump, number=number) / number
+        load_time = timeit.timeit(lambda: load(data), number=number) / number
+        print('%-16s %10d %12.2f %12.2f' % (name, len(data),
+                                            dump_time * 1000,
+                                            load_time * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,75 @@
+"""
+Time parsing and validating a generated config, and applying its checks
+with a ``Validator`` whose checks were compiled up front, or with the
+function ``Validator.codegen`` generates for the configspec.
+
+    python benchmarks/bench_validate.py [sections] [keys]
+"""
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from configobj import ConfigObj
+from validate import Validator
+
+
+CHECKS = [
+    ('integer(0, 1000)', '42'),
+    ('float(min=0.5, max=100)', '3.25'),
+    ('boolean(default=False)', 'yes'),
+    ('string(max=20)', 'some text'),
+    ('int_list(min=1, max=5)', '1, 2, 3'),
+    ("option('a', 'b', 'c')", 'b'),
+]
+
+
+def generated(sections, keys):
+    spec = ['']
+    config = ['']
+    for i in range(sections):
+        spec.append('[section%d]' % i)
+        config.append('[section%d]' % i)
+        for j in range(keys):
+            check, value = CHECKS[j % len(CHECKS)]
+            spec.append('key%d = %s' % (j, check))
+            config.append('key%d = %s' % (j, value))
+    return spec, config
+
+
+def main(sections=2000, keys=20):
+    spec, lines = generated(sections, keys)
+    configspec = ConfigObj(spec, _inspec=True)
+    vtor = Validator()
+    vtor.compile(configspec)
+    generated_validate = vtor.codegen(configspec)
+    config = ConfigObj(lines)
+    pairs = [(configspec[name][key], config[name][key])
+             for name in config for key in config[name]]
+    number = 3
+
+    def parse():
+        return ConfigObj(lines, configspec=configspec)
+
+    def validate():
+        assert parse().validate(vtor) is True
+
+    def codegen():
+        assert generated_validate(ConfigObj(lines)) is True
+
+    def checks():
+        check = vtor.check
+        for spec, value in pairs:
+            check(spec, value)
+
+    print('%d sections, %d keys each' % (sections, keys))
+    for name, fun in (('parse', parse), ('parse and validate', validate),
+                      ('parse and codegen', codegen), ('checks only', checks)):
+        best = min(timeit.repeat(fun, number=number, repeat=3))
+        print('%-20s %10.1f ms' % (name, best / number * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
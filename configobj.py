@@ -17,11 +17,25 @@
 # Comments, suggestions and bug reports welcome.
 import pdb
 
+import atexit
+import hashlib
+import marshal
 import os
+import pickle
 import re
+import struct
 import sys
+import tempfile
+import threading
+import time
+import warnings
+import weakref
 
 from codecs import BOM_UTF8, BOM_UTF16, BOM_UTF16_BE, BOM_UTF16_LE
+from codecs import getincrementalencoder
+from collections import OrderedDict
+from collections.abc import Mapping
+from io import BytesIO
 
 from ast import parse
 
@@ -76,6 +90,8 @@ noquot = "%s"
 wspace_plus = ' \r\n\v\t\'"'
 tsquot = '"""%s"""'
 tdquot = "'''%s'''"
+# values that are written as they are, whatever the settings
+_plain_value = re.compile(r'[^\s\'"#,](?:[^\n\'"#,]*[^\s\'"#,])?')
 
 # Sentinel for use in getattr calls to replace hasattr
 MISSING = object()
@@ -101,6 +117,12 @@ __all__ = (
     'DuplicateError',
     'ConfigspecError',
     'ConfigObj',
+    'ConfigspecRegistry',
+    'ValidationCache',
+    'FrozenSection',
+    'FrozenConfig',
+    'SharedSection',
+    'SharedConfig',
     'SimpleVal',
     'InterpolationError',
     'InterpolationLoopError',
@@ -116,6 +138,18 @@ __all__ = (
 DEFAULT_INTERPOLATION = 'configparser'
 DEFAULT_INDENT_TYPE = '    '
 MAX_INTERPOL_DEPTH = 10
+# number of values handed to each task when ``walk`` uses an executor
+WALK_BATCH_SIZE = 1000
+# size (in characters) of the chunks ``iter_write`` yields
+WRITE_CHUNK_SIZE = 65536
+# number of quoting decisions ``ConfigObj._quote`` remembers
+QUOTE_CACHE_SIZE = 4096
+# format of the data written by ``ConfigObj.dumps``
+DUMPS_VERSION = 2
+# number of sections a ``ValidationCache`` remembers in memory
+VALIDATION_CACHE_SIZE = 10000
+# bumped when what ``ValidationCache`` stores changes
+VALIDATION_CACHE_VERSION = 2
 
 OPTION_DEFAULTS = {
     'interpolation': True,
@@ -131,6 +165,10 @@ OPTION_DEFAULTS = {
     'default_encoding': None,
     'unrepr': False,
     'write_empty_values': False,
+    'path_index': False,
+    'incremental_write': False,
+    'keep_comments': True,
+    'shared_configspec': False,
 }
 
 def getObj(s):
@@ -437,6 +475,44 @@ def __newobj__(cls, *args):
     # Hack for pickle
     return cls.__new__(cls, *args)
     
+class _NoComments(dict):
+    """
+    Used in place of the ``comments`` and ``inline_comments`` dictionaries
+    when comments aren't kept. It stays empty, ignores changes and gives an
+    empty comment for any key. One instance of each is shared by every
+    section.
+    """
+
+    def __init__(self, empty):
+        dict.__init__(self)
+        self._empty = empty
+
+    def __missing__(self, key):
+        return self._empty()
+
+    def __setitem__(self, key, value):
+        pass
+
+    def __delitem__(self, key):
+        pass
+
+    def setdefault(self, key, default=None):
+        return self._empty()
+
+    def update(self, *args, **keywargs):
+        pass
+
+    def copy(self):
+        return self
+
+    def __reduce__(self):
+        return (_NoComments, (self._empty,))
+
+
+_NO_COMMENTS = _NoComments(list)
+_NO_INLINE_COMMENTS = _NoComments(str)
+
+
 class Section(dict):
     """
     A dictionary-like object that represents a section in a config file.
@@ -460,7 +536,19 @@ class Section(dict):
         self.__dict__.update(state[1])
     
     def __reduce__(self):
-        state = (dict(self), self.__dict__)
+        attributes = self.__dict__
+        if attributes.get('_sharers') or attributes.get('_validation_memo'):
+            # weak references to clones can't be pickled, and what
+            # ``revalidate`` remembers (with the validator it was made with)
+            # isn't carried across pickling
+            attributes = dict(attributes, _sharers=None,
+                              _validation_memo=None)
+        if '_subscribers' in attributes:
+            # change callbacks and autosaving are not carried across
+            # pickling
+            attributes = dict(attributes, _subscribers={}, _autosave=None,
+                              _default_maps={})
+        state = (dict(self), attributes)
         return (__newobj__, (self.__class__,), state)
 
     def __init__(self, parent, depth, main, indict=None, name=None):
@@ -481,6 +569,8 @@ class Section(dict):
         self.depth = depth
         # purely for information
         self.name = name
+        # bumped on every change to this section or any section below it
+        self.generation = 0
         #
         self._initialise()
         # we do this explicitly so that __setitem__ is used properly
@@ -494,15 +584,37 @@ class Section(dict):
         # the sequence of sections in this Section
         self.sections = []
         # for comments :-)
-        self.comments = {}
-        self.inline_comments = {}
+        self._reset_comments()
         # the configspec
         self.configspec = None
         # for defaults
         self.defaults = []
         self.default_values = {}
+        # the defaults read in place of missing values, shared between the
+        # sections validated with ``virtual_defaults`` against one configspec
+        self._virtual_defaults = None
         self.extra_values = []
         self._created = False
+        # converted values from the ``as_*`` methods, keyed by key then type
+        self._typed_cache = {}
+        # subsections still shared with the section this one was cloned from
+        self._shared = set()
+        # (weak reference to section, key) for every clone section sharing
+        # self as one of its subsections, or None
+        self._sharers = None
+        # what ``revalidate`` found, a ``_SectionMemo``, or None
+        self._validation_memo = None
+        # members unchanged since they were read: key -> (first line,
+        # line after the last, inline comment) in ``main._source_lines``
+        self._spans = {}
+
+    def _reset_comments(self):
+        if self.main.keep_comments:
+            self.comments = {}
+            self.inline_comments = {}
+        else:
+            self.comments = _NO_COMMENTS
+            self.inline_comments = _NO_INLINE_COMMENTS
 
     def _interpolate(self, key, value):
         try:
@@ -528,7 +640,20 @@ class Section(dict):
 
     def __getitem__(self, key):
         """Fetch the item and do string interpolation."""
-        val = dict.__getitem__(self, key)
+        try:
+            val = dict.__getitem__(self, key)
+        except KeyError:
+            virtual = self._virtual_defaults
+            if virtual is None or key not in virtual:
+                raise
+            val = virtual[key]
+            if type(val) is list:
+                val = list(val)
+        if self._shared and key in self._shared:
+            return self._materialize(key)
+        if type(val) is list and self.main._lent:
+            # the list may be changed in place, so clones mustn't share it
+            self._unshare()
         if self.main.interpolation: 
             if isinstance(val, str):
                 return self._interpolate(key, val)
@@ -556,9 +681,23 @@ class Section(dict):
         ``unrepr`` must be set when setting a value to a dictionary, without
         creating a new sub-section.
         """
+        saver = self.main._autosave
+        if saver is not None:
+            # not while the config is being read for autosaving
+            with saver.lock:
+                return self._setitem(key, value, unrepr)
+        return self._setitem(key, value, unrepr)
+
+    def _setitem(self, key, value, unrepr):
         if not isinstance(key, str):
             raise ValueError('The key "%s" is not a string.' % key)
         
+        if self.main._lent:
+            self._unshare()
+        if key in self._typed_cache:
+            del self._typed_cache[key]
+        self._shared.discard(key)
+        self._spans.pop(key, None)
         # add the comment
         if key not in self.comments:
             self.comments[key] = []
@@ -567,10 +706,15 @@ class Section(dict):
         if key in self.defaults:
             self.defaults.remove(key)
         #
+        index = self.main._path_index
+        if index is not None and key in self:
+            self._unindex(index, key)
         if isinstance(value, Section):
             if key not in self:
                 self.sections.append(key)
             dict.__setitem__(self, key, value)
+            if index is not None:
+                value._index_members(index, self._path() + (key,))
         elif isinstance(value, dict) and not unrepr:
             # First create the new depth level,
             # then create the section
@@ -599,17 +743,36 @@ class Section(dict):
                 else:
                     raise TypeError('Value is not a string "%s".' % value)
             dict.__setitem__(self, key, value)
+        if index is not None:
+            index[self._path() + (key,)] = (self, key)
+        self._changed(key)
 
 
     def __delitem__(self, key):
         """Remove items from the sequence when deleting."""
+        saver = self.main._autosave
+        if saver is not None:
+            with saver.lock:
+                return self._delitem(key)
+        return self._delitem(key)
+
+    def _delitem(self, key):
+        if self.main._lent:
+            self._unshare()
+        index = self.main._path_index
+        if index is not None and key in self:
+            self._unindex(index, key)
         dict. __delitem__(self, key)
+        self._typed_cache.pop(key, None)
+        self._shared.discard(key)
+        self._spans.pop(key, None)
         if key in self.scalars:
             self.scalars.remove(key)
         else:
             self.sections.remove(key)
         del self.comments[key]
         del self.inline_comments[key]
+        self._changed(key)
 
     def get(self, key, default=None):
         """A version of ``get`` that doesn't bypass string interpolation."""
@@ -660,14 +823,35 @@ class Section(dict):
         Leaves other attributes alone :
             depth/main/parent are not affected
         """
+        saver = self.main._autosave
+        if saver is not None:
+            with saver.lock:
+                return self._clear()
+        return self._clear()
+
+    def _clear(self):
+        if self.main._lent:
+            self._unshare()
+        index = self.main._path_index
+        if index is not None:
+            if self.main is self:
+                index.clear()
+            else:
+                for key in self.scalars + self.sections:
+                    self._unindex(index, key)
         dict.clear(self)
         self.scalars = []
         self.sections = []
-        self.comments = {}
-        self.inline_comments = {}
+        self._reset_comments()
         self.configspec = None
         self.defaults = []
+        self._virtual_defaults = None
         self.extra_values = []
+        self._typed_cache = {}
+        self._shared = set()
+        self._spans = {}
+        self._validation_memo = None
+        self._changed()
 
 
     def setdefault(self, key, default=None):
@@ -755,6 +939,168 @@ class Section(dict):
         return newdict
 
 
+    def clone(self):
+        """
+        Return a copy-on-write copy of self.
+
+        Subsections are not copied straight away: the clone shares them with
+        the original. A shared subsection is copied (that section alone, its
+        own subsections stay shared) when it is fetched from the clone, as
+        it may then be changed, or just before the original changes it or a
+        section above it. Cloning copies the members of self, so it costs
+        O(number of members of self) - for a ConfigObj, the width of the
+        root - and changing a few values then costs as much as the sections
+        along the changed paths.
+        """
+        new = Section(self.parent, self.depth, self.main, name=self.name)
+        self._copy_into(new)
+        return new
+
+
+    def _copy_into(self, new):
+        """
+        Copy the members and attributes of self into the empty section
+        ``new``, sharing the subsections with it.
+        """
+        dict.update(new, self)
+        for entry in self.scalars:
+            val = dict.__getitem__(self, entry)
+            if isinstance(val, list):
+                # create a copy rather than a reference
+                dict.__setitem__(new, entry, list(val))
+        new.scalars = list(self.scalars)
+        new.sections = list(self.sections)
+        new.comments = self.comments.copy()
+        new.inline_comments = self.inline_comments.copy()
+        new.configspec = self.configspec
+        new.defaults = list(self.defaults)
+        if self._virtual_defaults is not None:
+            new.default_values = self.default_values
+            new._virtual_defaults = self._virtual_defaults
+        else:
+            new.default_values = dict(self.default_values)
+        new.extra_values = list(self.extra_values)
+        new._created = self._created
+        new._shared = set(self.sections)
+        new._spans = dict(self._spans)
+        for entry in self.sections:
+            dict.__getitem__(self, entry)._lend(new, entry)
+
+
+    def _lend(self, section, key):
+        """Record that ``section[key]`` is self, shared with a clone."""
+        if self._sharers is None:
+            self._sharers = []
+        self._sharers.append((weakref.ref(section), key))
+        self.main._lent = True
+
+
+    def _unshare(self):
+        """
+        Called before self is changed: give every clone section sharing
+        self, or a section above it, a copy of its own first.
+        """
+        chain = [self]
+        while chain[-1].parent is not chain[-1]:
+            chain.append(chain[-1].parent)
+        # from the top down, as copying a section shares its subsections
+        for section in reversed(chain):
+            sharers = section._sharers
+            if not sharers:
+                continue
+            section._sharers = None
+            for ref, key in sharers:
+                borrower = ref()
+                if (borrower is not None and key in borrower._shared and
+                    dict.get(borrower, key) is section):
+                    borrower._materialize(key)
+
+
+    def _materialize(self, key):
+        """Replace a shared subsection with a copy that belongs to self."""
+        shared = dict.__getitem__(self, key)
+        section = Section(self, self.depth + 1, self.main, name=key)
+        shared._copy_into(section)
+        dict.__setitem__(self, key, section)
+        self._shared.discard(key)
+        if shared._sharers:
+            shared._sharers = [(ref, entry) for (ref, entry) in shared._sharers
+                               if ref() is not self] or None
+        index = self.main._path_index
+        if index is not None:
+            # the index may still point at the shared section
+            path = self._path() + (key,)
+            for entry in section.scalars + section.sections:
+                if path + (entry,) in index:
+                    index[path + (entry,)] = (section, entry)
+        return section
+
+
+    def _path(self):
+        """The tuple of section names leading from main down to self."""
+        path = []
+        section = self
+        while section.parent is not section:
+            path.append(section.name)
+            section = section.parent
+        path.reverse()
+        return tuple(path)
+
+
+    def _changed(self, *keys):
+        """
+        Record a change to the members ``keys`` (or to the whole section if
+        none are given): bump the generation of this section and of every
+        section above it, then notify any subscribers.
+        """
+        section = self
+        section.generation += 1
+        while section.parent is not section:
+            section = section.parent
+            section.generation += 1
+        if section._subscribers:
+            path = self._path()
+            if keys:
+                for key in keys:
+                    section._notify(path + (key,))
+            else:
+                section._notify(path)
+
+
+    def _index_members(self, index, path):
+        """Add all the members of self (at ``path``) to a path index."""
+        for prefix, section, key in self._walk_members(True, True):
+            index[path + prefix + (key,)] = (section, key)
+
+
+    def _unindex(self, index, key):
+        """Remove a member, and everything below it, from a path index."""
+        path = self._path() + (key,)
+        index.pop(path, None)
+        val = dict.__getitem__(self, key)
+        if isinstance(val, Section):
+            for prefix, section, entry in val._walk_members(True, True):
+                index.pop(path + prefix + (entry,), None)
+
+
+    def freeze(self, previous=None):
+        """
+        Return an immutable, hashable snapshot of self.
+
+        Interpolation is done once, while the snapshot is taken, and lists
+        become tuples. The snapshot can be shared between threads.
+
+        If ``previous`` is an earlier snapshot of the same section (for
+        example taken before a ``reload``), subsections that haven't changed
+        are reused from it instead of being copied again.
+        """
+        if self.main is self:
+            klass = FrozenConfig
+        else:
+            klass = FrozenSection
+        return _freeze(self, previous, klass)
+
+
     def merge(self, indict):
         """
         A recursive update - useful for merging config files.
@@ -791,6 +1137,15 @@ class Section(dict):
         
         Also renames comments.
         """
+        saver = self.main._autosave
+        if saver is not None:
+            with saver.lock:
+                return self._rename(oldkey, newkey)
+        return self._rename(oldkey, newkey)
+
+    def _rename(self, oldkey, newkey):
+        if self.main._lent:
+            self._unshare()
         if oldkey in self.scalars:
             the_list = self.scalars
         elif oldkey in self.sections:
@@ -799,9 +1154,23 @@ class Section(dict):
             raise KeyError('Key "%s" not found.' % oldkey)
         pos = the_list.index(oldkey)
         #
+        self._typed_cache.pop(oldkey, None)
+        self._typed_cache.pop(newkey, None)
+        self._spans.pop(oldkey, None)
+        self._spans.pop(newkey, None)
+        index = self.main._path_index
+        if index is not None:
+            self._unindex(index, oldkey)
         val = self[oldkey]
         dict.__delitem__(self, oldkey)
         dict.__setitem__(self, newkey, val)
+        if isinstance(val, Section):
+            val.name = newkey
+        if index is not None:
+            path = self._path() + (newkey,)
+            index[path] = (self, newkey)
+            if isinstance(val, Section):
+                val._index_members(index, path)
         the_list.remove(oldkey)
         the_list.insert(pos, newkey)
         comm = self.comments[oldkey]
@@ -810,9 +1179,10 @@ class Section(dict):
         del self.inline_comments[oldkey]
         self.comments[newkey] = comm
         self.inline_comments[newkey] = inline_comment
+        self._changed(oldkey, newkey)
     
     def walk(self, function, raise_errors=True,
-            call_on_sections=False, **keywargs):
+            call_on_sections=False, executor=None, **keywargs):
         """
         Walk every member and call a function on the keyword and value.
         
@@ -825,6 +1195,13 @@ class Section(dict):
         Any unrecognised keyword arguments you pass to walk, will be pased on
         to the function you pass in.
         
+        If ``executor`` is given (a ``concurrent.futures`` thread or process
+        pool) then ``function`` must instead be a pure function of the value:
+        it is called as ``function(value, **keywargs)`` for every scalar, in
+        the pool, with the value as stored (not interpolated). The results
+        are written back into the sections, in batches, as they come in.
+        ``call_on_sections`` can't be used with an executor.
+        
         Note: if ``call_on_sections`` is ``True`` then - on encountering a
         subsection, *first* the function is called for the *whole* subsection,
         and then recurses into it's members. This means your function must be
@@ -858,6 +1235,12 @@ class Section(dict):
         >>> cfg
         ConfigObj({'CLIENT1section': {'CLIENT1key': 'CLIENT1value'}})
         """
+        if executor is not None:
+            if call_on_sections:
+                raise ValueError('call_on_sections can not be used with '
+                                 'an executor.')
+            return self._walk_executor(function, raise_errors, executor,
+                                       keywargs)
         out = {}
         # scalars first
         for i in range(len(self.scalars)):
@@ -895,6 +1278,91 @@ class Section(dict):
                 **keywargs)
         return out
     
+    def _walk_executor(self, function, raise_errors, executor, keywargs):
+        """The ``walk`` implementation used when an executor is given."""
+        out = {}
+        outs = {(): out}
+        pending = []
+        batch = []
+        for path, section, entry in self.iter_walk(call_on_sections=True):
+            if entry in section.sections:
+                outs[path + (entry,)] = outs[path][entry] = {}
+                continue
+            outs[path][entry] = None
+            batch.append((path, section, entry))
+            if len(batch) == WALK_BATCH_SIZE:
+                pending.append(self._submit_walk_batch(
+                    executor, function, batch, raise_errors, keywargs))
+                batch = []
+        if batch:
+            pending.append(self._submit_walk_batch(
+                executor, function, batch, raise_errors, keywargs))
+
+        for batch, future in pending:
+            for (path, section, entry), (ok, result) in zip(batch,
+                                                            future.result()):
+                if not ok:
+                    outs[path][entry] = False
+                    continue
+                if result is not dict.__getitem__(section, entry):
+                    section[entry] = result
+                outs[path][entry] = result
+        return out
+
+    def _submit_walk_batch(self, executor, function, batch, raise_errors,
+                           keywargs):
+        values = [dict.__getitem__(section, entry)
+                  for (path, section, entry) in batch]
+        future = executor.submit(_walk_batch, function, values, raise_errors,
+                                 keywargs)
+        return batch, future
+
+    def iter_walk(self, call_on_sections=False):
+        """
+        A generator that walks every member, without recursion.
+        
+        Yields ``(path, section, key)`` tuples for every scalar, in the same
+        order as ``walk``. ``path`` is a tuple of the names of the sections
+        leading to ``section``, starting below self. If ``call_on_sections``
+        is ``True``, subsections are yielded too, before their members.
+        
+        As with ``walk`` you can rename the member you are given, but
+        mustn't add or delete members while walking.
+        
+        >>> cfg = ConfigObj({'a': '1', 'sect': {'b': '2'}})
+        >>> [(path, key) for (path, section, key) in cfg.iter_walk()]
+        [((), 'a'), (('sect',), 'b')]
+        """
+        return self._walk_members(call_on_sections, False)
+
+    def _walk_members(self, call_on_sections, shared):
+        """
+        The generator behind ``iter_walk``. If ``shared`` is set, subsections
+        a clone still shares with the original are yielded as they are,
+        rather than copied for the clone, so they must only be read.
+        """
+        for i in range(len(self.scalars)):
+            yield (), self, self.scalars[i]
+        # each frame is a section and the index of its next subsection
+        stack = [((), self, 0)]
+        while stack:
+            path, section, index = stack.pop()
+            if index >= len(section.sections):
+                continue
+            stack.append((path, section, index + 1))
+            if call_on_sections:
+                yield path, section, section.sections[index]
+            # bound again in case name has changed
+            entry = section.sections[index]
+            if shared:
+                child = dict.__getitem__(section, entry)
+            else:
+                child = section[entry]
+            child_path = path + (entry,)
+            for i in range(len(child.scalars)):
+                yield child_path, child, child.scalars[i]
+            stack.append((child_path, child, 0))
+
     def as_bool(self, key):
         """
         Accepts a key as input. The corresponding value must be a string or
@@ -923,7 +1391,9 @@ class Section(dict):
         >>> a.as_bool('b')
         0
         """
-        val = self[key]
+        return self._as_type(key, bool, self._to_bool)
+
+    def _to_bool(self, val):
         if val == True:
             return True
         elif val == False:
@@ -958,7 +1428,7 @@ class Section(dict):
         Traceback (most recent call last):
         ValueError: invalid literal for int() with base 10: '3.2'
         """
-        return int(self[key])
+        return self._as_type(key, int, int)
     
     def as_float(self, key):
         """
@@ -979,7 +1449,7 @@ class Section(dict):
         >>> a.as_float('b')
         3.2000000000000002
         """
-        return float(self[key])
+        return self._as_type(key, float, float)
 
     def as_list(self, key):
         """
@@ -997,10 +1467,78 @@ class Section(dict):
         >>> a.as_list('a')
         [1]
         """
-        result = self[key]
-        if isinstance(result, (tuple, list)):
-            return list(result)
-        return [result]
+        return list(self._as_type(key, list, self._to_list))
+
+    def _to_list(self, val):
+        if isinstance(val, (tuple, list)):
+            return list(val)
+        return [val]
+
+    def as_array(self, key, dtype=float):
+        """
+        A convenience method which fetches the specified value as a NumPy
+        array of ``dtype``. A single value gives an array with one member.
+
+        NumPy converts all of the members at once (raising a ``ValueError``
+        for the first it can't convert), except for a ``bool`` dtype where
+        they are converted like ``as_bool`` does. NumPy must be installed.
+
+        Unlike the other ``as_*`` methods the result isn't remembered, as
+        arrays can be changed in place.
+        """
+        import numpy
+        val = self._to_list(self[key])
+        if numpy.dtype(dtype) == numpy.dtype(bool):
+            val = [self._to_bool(mem) for mem in val]
+        return numpy.array(val, dtype=dtype)
+
+    def _as_type(self, key, kind, convert):
+        """
+        Fetch the value for ``key`` converted with ``convert``.
+
+        Conversions are remembered per key and type, until the key is set or
+        deleted. Lists (which can be changed in place) and strings that may
+        be interpolated are converted every time.
+        """
+        try:
+            return self._typed_cache[key][kind]
+        except KeyError:
+            pass
+        val = self[key]
+        result = convert(val)
+        if val is dict.get(self, key, MISSING) and not (
+            isinstance(val, list) or
+            (isinstance(val, str) and ('%' in val or '$' in val))):
+            self._typed_cache.setdefault(key, {})[kind] = result
+        return result
+
+    def as_types(self, types):
+        """
+        Convert several values in one pass.
+
+        ``types`` is a dictionary mapping keys to one of ``bool``, ``int``,
+        ``float`` or ``list``. Returns a dictionary of the converted values.
+
+        >>> a = ConfigObj()
+        >>> a['a'] = '3'
+        >>> a['b'] = 'yes'
+        >>> a.as_types({'a': int, 'b': bool})
+        {'a': 3, 'b': True}
+        """
+        accessors = {
+            bool: self.as_bool,
+            int: self.as_int,
+            float: self.as_float,
+            list: self.as_list,
+        }
+        out = {}
+        for key, kind in types.items():
+            try:
+                accessor = accessors[kind]
+            except KeyError:
+                raise TypeError('Unsupported type "%s".' % kind)
+            out[key] = accessor(key)
+        return out
 
     def restore_default(self, key):
         """
@@ -1010,11 +1548,28 @@ class Section(dict):
         with a configspec and has been validated.
 
         If there is no default value for this key, ``KeyError`` is raised.
+        A missing value read from the defaults (see ``virtual_defaults`` in
+        ``validate``) is left missing.
         """
+        saver = self.main._autosave
+        if saver is not None:
+            with saver.lock:
+                return self._restore_default(key)
+        return self._restore_default(key)
+
+    def _restore_default(self, key):
         default = self.default_values[key]
+        if (self._virtual_defaults is not None and
+            not dict.__contains__(self, key)):
+            return default
+        if self.main._lent:
+            self._unshare()
         dict.__setitem__(self, key, default)
+        self._typed_cache.pop(key, None)
+        self._spans.pop(key, None)
         if key not in self.defaults:
             self.defaults.append(key)
+        self._changed(key)
         return default
 
     def restore_defaults(self):
@@ -1034,6 +1589,887 @@ class Section(dict):
             self[section].restore_defaults()
 
 
+def _freeze_value(value):
+    """Turn lists (and their members) into tuples."""
+    if isinstance(value, (list, tuple)):
+        return tuple([_freeze_value(entry) for entry in value])
+    return value
+
+
+def _freeze(section, previous, klass=None):
+    """
+    Build the ``FrozenSection`` for ``section``.
+
+    Returns ``previous`` itself if nothing in the section has changed.
+    """
+    if not isinstance(previous, FrozenSection):
+        previous = None
+    data = {}
+    unchanged = previous is not None and (
+        previous.scalars == tuple(section.scalars) and
+        previous.sections == tuple(section.sections))
+    for entry in section.scalars:
+        value = _freeze_value(section[entry])
+        if unchanged:
+            old = previous._data[entry]
+            unchanged = type(old) is type(value) and old == value
+        data[entry] = value
+    for entry in section.sections:
+        old = None
+        if previous is not None:
+            old = previous._data.get(entry)
+        value = _freeze(section[entry], old)
+        if unchanged:
+            unchanged = value is old
+        data[entry] = value
+    if unchanged:
+        return previous
+    if klass is None:
+        klass = FrozenSection
+    return klass(section.name, section.scalars, section.sections, data)
+
+
+def _validate_scalar(validator, spec, val, missing, in_configspec):
+    """
+    Apply one check, for ``ConfigObj.validate``.
+    
+    Returns ``(has_default, default, ok, result)``, where ``result`` is the
+    converted value or the ``ValidateError`` raised by the check.
+    """
+    has_default = False
+    default = None
+    if in_configspec:
+        try:
+            default = validator.get_default_value(spec)
+            has_default = True
+        except (KeyError, AttributeError, validator.baseErrorClass):
+            # No default, bad default or validator has no 'get_default_value'
+            # (e.g. SimpleVal)
+            pass
+    try:
+        check = validator.check(spec, val, missing=missing)
+    except validator.baseErrorClass as e:
+        return has_default, default, False, e
+    return has_default, default, True, check
+
+
+def _validate_batch(validator, tasks):
+    """
+    Apply the checks of a batch of sections, for ``ConfigObj.validate``
+    with an executor.
+    """
+    return [[_validate_scalar(validator, *task) for task in section_tasks]
+            for section_tasks in tasks]
+
+
+def _validate_flags(check, ret_true, ret_false):
+    """Update the pass/fail flags of a section for the result of a scalar."""
+    if check is True:
+        ret_false = False
+    else:
+        ret_true = False
+        if check is not False:
+            # a preserved error
+            ret_false = False
+    return ret_true, ret_false
+
+
+def _same_value(value, other):
+    return value is other or (type(value) is type(other) and value == other)
+
+
+class _EntryMemo(object):
+    """
+    The outcome of checking a scalar, remembered by ``ConfigObj.revalidate``
+    with the value and check it came from.
+    """
+
+    __slots__ = ('spec', 'missing', 'raw', 'val', 'interpolated', 'read',
+                 'outcome', 'result')
+
+    def __init__(self, section, entry, spec, raw, val, missing, outcome,
+                 result):
+        self.spec = spec
+        # the value as it was checked, before the outcome was stored
+        self.read = (missing, raw, val)
+        self.outcome = outcome
+        self.result = result
+        # was the value read interpolated ? (``val`` is None when missing)
+        self.interpolated = val is not raw and val is not None
+        # the value as validate will find it next time
+        self.raw = dict.get(section, entry, MISSING)
+        self.missing = self.raw is MISSING or entry in section.defaults
+        if self.missing:
+            self.val = None
+        elif self.raw is raw:
+            self.val = val
+        else:
+            self.val = section[entry]
+
+    def matches(self, spec, raw, val, missing):
+        """Would checking this value again give the same outcome ?"""
+        return (spec == self.spec and missing == self.missing and
+                _same_value(raw, self.raw) and
+                (missing or _same_value(val, self.val)))
+
+    def matches_read(self, spec, raw, val, missing):
+        """
+        Is this the value that was checked, before its outcome was stored ?
+        (As when the section is read again by ``reload``.)
+        """
+        read_missing, read_raw, read_val = self.read
+        return (spec == self.spec and missing == read_missing and
+                _same_value(raw, read_raw) and
+                (missing or _same_value(val, read_val)))
+
+    def stored_outcome(self):
+        """The outcome to store again, for the value that was checked."""
+        has_default, default, ok, check = self.outcome
+        if isinstance(check, list):
+            # checking gives a new list every time
+            check = list(check)
+        return has_default, default, ok, check
+
+    def restore(self, section, entry, copy):
+        has_default, default = self.outcome[:2]
+        section.default_values.pop(entry, None)
+        if has_default:
+            section.default_values[entry] = default
+        if self.missing and self.raw is not MISSING:
+            # validate sets a missing value again, which moves it to the
+            # end of ``defaults``
+            section.defaults.remove(entry)
+            if not copy:
+                section.defaults.append(entry)
+        return self.result
+
+
+class _SectionMemo(object):
+    """
+    What ``ConfigObj.revalidate`` remembers about a section, kept on the
+    section (so it goes when the section is deleted or replaced).
+    """
+
+    __slots__ = ('options', 'configspec', 'generation', 'depends', 'result',
+                 'entries')
+
+    def __init__(self, section, options, depends, result, entries):
+        # the validator, preserve_errors and copy it was validated with
+        self.options = options
+        self.configspec = section.configspec
+        self.generation = section.generation
+        # whether a value in or below the section is interpolated, and so
+        # could change without the section changing
+        self.depends = depends
+        self.result = result
+        self.entries = entries
+
+    def reread(self):
+        """A copy for the same section read again, which isn't unchanged."""
+        memo = _SectionMemo.__new__(_SectionMemo)
+        for name in self.__slots__:
+            setattr(memo, name, getattr(self, name))
+        memo.generation = None
+        return memo
+
+    def unchanged(self, section, options):
+        """Can the section be skipped, using the remembered result ?"""
+        return (self.options == options and self.configspec is section.configspec and
+                self.generation == section.generation and not self.depends)
+
+
+def _validate_combine(out, entry, check, ret_true, ret_false):
+    """Add the result of validating subsection ``entry`` to ``out``."""
+    out[entry] = check
+    if check == False:
+        ret_true = False
+    elif check == True:
+        ret_false = False
+    else:
+        ret_true = False
+    return ret_true, ret_false
+
+
+def _walk_batch(function, values, raise_errors, keywargs):
+    """
+    Call ``function`` on a batch of values, for ``Section.walk``.
+    
+    Returns a list of ``(ok, result)`` pairs.
+    """
+    results = []
+    for value in values:
+        try:
+            results.append((True, function(value, **keywargs)))
+        except Exception:
+            if raise_errors:
+                raise
+            results.append((False, None))
+    return results
+
+
+class FrozenSection(Mapping):
+    """
+    An immutable snapshot of a ``Section``, made by ``Section.freeze``.
+
+    It is a read only mapping that keeps the order of the section (scalars,
+    then sections) and has the ``name``, ``scalars`` and ``sections``
+    attributes. Values are stored already interpolated, with lists turned
+    into tuples, so a snapshot is hashable as long as its values are.
+    """
+
+    __slots__ = ('name', 'scalars', 'sections', '_data', '_hash')
+
+    def __init__(self, name, scalars, sections, data):
+        set_attr = object.__setattr__
+        set_attr(self, 'name', name)
+        set_attr(self, 'scalars', tuple(scalars))
+        set_attr(self, 'sections', tuple(sections))
+        set_attr(self, '_data', data)
+        set_attr(self, '_hash', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is read only.' % self.__class__.__name__)
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenSection):
+            return self._data == other._data
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash',
+                               hash(frozenset(self._data.items())))
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__,
+                (self.name, self.scalars, self.sections, self._data))
+
+    def __repr__(self):
+        return '%s({%s})' % (self.__class__.__name__,
+            ', '.join(['%r: %r' % item for item in self._data.items()]))
+
+    __str__ = __repr__
+
+    def dict(self):
+        """
+        Return a mutable copy as nested dictionaries, with tuple values
+        turned back into lists.
+        """
+        newdict = {}
+        for entry, value in self._data.items():
+            if isinstance(value, FrozenSection):
+                value = value.dict()
+            elif isinstance(value, tuple):
+                value = list(value)
+            newdict[entry] = value
+        return newdict
+
+
+class FrozenConfig(FrozenSection):
+    """An immutable snapshot of a ``ConfigObj``, made by ``ConfigObj.freeze``."""
+
+    __slots__ = ()
+
+
+# layout of the block written by ``ConfigObj.to_shared_memory``: a header,
+# then nodes (one per section) of an entry count followed by the entries,
+# which point at the key and value bytes stored elsewhere in the block
+_SHARED_MAGIC = b'ConfigOb'
+_SHARED_VERSION = 1
+_SHARED_HEADER = struct.Struct('<8sIIQ')
+_SHARED_NODE = struct.Struct('<I')
+_SHARED_ENTRY = struct.Struct('<BIIII')
+# names of the blocks ``ConfigObj.to_shared_memory`` made in this process
+_shared_blocks = set()
+# kinds of entry
+_SHARED_STRING = 0
+_SHARED_SECTION = 1
+_SHARED_OBJECT = 2
+
+
+def _shared_layout(section):
+    """Lay out ``section`` and everything below it for shared memory."""
+    out = bytearray(_SHARED_HEADER.size)
+    offsets = {}
+    def store(data):
+        # each distinct key or value is only stored once
+        offset = offsets.get(data)
+        if offset is None:
+            offset = offsets[data] = len(out)
+            out.extend(data)
+        return offset
+
+    def add_node(section):
+        keys = section.scalars + section.sections
+        node = len(out)
+        out.extend(_SHARED_NODE.pack(len(keys)))
+        out.extend(bytes(_SHARED_ENTRY.size * len(keys)))
+        position = node + _SHARED_NODE.size
+        for entry in section.scalars:
+            # interpolation is done now, so readers don't have to
+            value = section[entry]
+            if isinstance(value, str):
+                kind = _SHARED_STRING
+                data = value.encode('utf-8')
+            else:
+                kind = _SHARED_OBJECT
+                data = marshal.dumps(value)
+            key = entry.encode('utf-8')
+            _SHARED_ENTRY.pack_into(out, position, kind, store(key), len(key),
+                                    store(data), len(data))
+            position += _SHARED_ENTRY.size
+        for entry in section.sections:
+            pending.append((position, entry, dict.__getitem__(section, entry)))
+            position += _SHARED_ENTRY.size
+        return node
+
+    pending = []
+    root = add_node(section)
+    while pending:
+        position, entry, child = pending.pop()
+        key = entry.encode('utf-8')
+        key_offset = store(key)
+        _SHARED_ENTRY.pack_into(out, position, _SHARED_SECTION, key_offset,
+                                len(key), add_node(child), 0)
+    if len(out) >= 2 ** 32:
+        raise ValueError('Config is too big to put in shared memory.')
+    _SHARED_HEADER.pack_into(out, 0, _SHARED_MAGIC, _SHARED_VERSION, root,
+                             len(out))
+    return out
+
+
+class SharedSection(Mapping):
+    """
+    A read only view of a section stored in shared memory by
+    ``ConfigObj.to_shared_memory``. See ``SharedConfig``.
+
+    Like ``FrozenSection`` it is a mapping with ``name``, ``scalars`` and
+    ``sections`` attributes. Values are read from the shared block when they
+    are fetched, and were interpolated when the block was written.
+    """
+
+    __slots__ = ('name', '_buf', '_node', '_entries', '_children')
+
+    def __init__(self, buf, node, name=None):
+        self.name = name
+        self._buf = buf
+        self._node = node
+        # key -> (kind, offset, length), read when first needed
+        self._entries = None
+        self._children = {}
+
+    def _get_entries(self):
+        entries = self._entries
+        if entries is None:
+            buf = self._buf
+            count, = _SHARED_NODE.unpack_from(buf, self._node)
+            position = self._node + _SHARED_NODE.size
+            entries = {}
+            for _ in range(count):
+                kind, key_offset, key_length, offset, length = (
+                    _SHARED_ENTRY.unpack_from(buf, position))
+                key = str(buf[key_offset:key_offset + key_length], 'utf-8')
+                entries[key] = (kind, offset, length)
+                position += _SHARED_ENTRY.size
+            self._entries = entries
+        return entries
+
+    @property
+    def scalars(self):
+        return [key for key, (kind, offset, length)
+                in self._get_entries().items() if kind != _SHARED_SECTION]
+
+    @property
+    def sections(self):
+        return [key for key, (kind, offset, length)
+                in self._get_entries().items() if kind == _SHARED_SECTION]
+
+    def __getitem__(self, key):
+        kind, offset, length = self._get_entries()[key]
+        if kind == _SHARED_STRING:
+            return str(self._buf[offset:offset + length], 'utf-8')
+        if kind == _SHARED_OBJECT:
+            return marshal.loads(self._buf[offset:offset + length])
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = SharedSection(self._buf, offset, key)
+        return child
+
+    def __iter__(self):
+        return iter(self._get_entries())
+
+    def __len__(self):
+        return len(self._get_entries())
+
+    def __contains__(self, key):
+        return key in self._get_entries()
+
+    def __repr__(self):
+        return '%s({%s})' % (self.__class__.__name__,
+            ', '.join(['%r: %r' % item for item in self.items()]))
+
+    __str__ = __repr__
+
+    def dict(self):
+        """Return a copy of the section as nested dictionaries."""
+        newdict = {}
+        for entry, value in self.items():
+            if isinstance(value, SharedSection):
+                value = value.dict()
+            newdict[entry] = value
+        return newdict
+
+
+def _attach_shared(name):
+    """
+    Attach the shared memory block ``name`` for ``SharedConfig``.
+
+    Before Python 3.13 attaching a block registers it with the resource
+    tracker of the process, which removes the block when the process (and
+    the processes sharing its tracker) exit. Unless the tracker is the one
+    the block was made with (in this process, or in the parent the tracker
+    was inherited from), the block is taken off it again, so that it is
+    only removed by its owner.
+    """
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+    tracker = resource_tracker._resource_tracker
+    inherited = tracker._fd is not None and tracker._pid is None
+    block = shared_memory.SharedMemory(name=name)
+    if not inherited and name not in _shared_blocks:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class SharedConfig(SharedSection):
+    """
+    A read only view of a ConfigObj stored in shared memory.
+
+    ``block`` is the name of a block written by ``ConfigObj.to_shared_memory``,
+    or the ``SharedMemory`` object it returned. Every process that attaches
+    the block reads the same memory, rather than holding its own copy of the
+    config. Call ``close`` when done with it.
+    """
+
+    __slots__ = ('_block',)
+
+    def __init__(self, block):
+        if isinstance(block, str):
+            block = _attach_shared(block)
+        buf = block.buf
+        magic, version, root, size = _SHARED_HEADER.unpack_from(buf, 0)
+        if magic != _SHARED_MAGIC or version != _SHARED_VERSION:
+            raise ValueError('Not a config written by to_shared_memory.')
+        SharedSection.__init__(self, buf, root)
+        self._block = block
+
+    def close(self):
+        """Stop using the shared block. It is not removed (unlinked)."""
+        self._entries = None
+        self._children = {}
+        self._buf = None
+        self._block.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# quotes chosen by ``ConfigObj._quote``, keyed by value and settings
+_quote_cache = {}
+
+
+def _parse_configspec(configspec):
+    """Read a configspec that isn't a ConfigObj already."""
+    try:
+        return ConfigObj(configspec,
+                         raise_errors=True,
+                         file_error=True,
+                         _inspec=True)
+    except ConfigObjError as e:
+        # FIXME: Should these errors have a reference
+        #        to the already parsed ConfigObj ?
+        raise ConfigspecError('Parsing configspec failed: %s' % e)
+    except IOError as e:
+        raise IOError('Reading configspec failed: %s' % e)
+
+
+class ConfigspecRegistry(object):
+    """
+    Configspec files parsed once and shared by every ConfigObj created with
+    ``shared_configspec=True``.
+
+    Each file is kept under its absolute path, along with its modification
+    time and size, and read again once either changes. The configspecs
+    handed out are shared, so they must not be changed.
+
+    A validator passed to ``compile`` compiles the checks of every
+    configspec in the registry, and of the ones read after that, as soon as
+    they are read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # absolute path -> ((mtime, size), configspec)
+        self._specs = {}
+        self._validators = weakref.WeakSet()
+
+    def __len__(self):
+        return len(self._specs)
+
+    def get(self, filename):
+        """Return the configspec in ``filename``, reading it if need be."""
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise IOError('Reading configspec failed: %s' % e)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._specs.get(path)
+            validators = list(self._validators)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        configspec = _parse_configspec(path)
+        for validator in validators:
+            validator.compile(configspec)
+        with self._lock:
+            self._specs[path] = (stamp, configspec)
+        return configspec
+
+    def compile(self, validator):
+        """
+        Compile the checks of every configspec, now and as they are read,
+        with ``validator`` (see ``Validator.compile``).
+        """
+        with self._lock:
+            self._validators.add(validator)
+            specs = [configspec for stamp, configspec in self._specs.values()]
+        for configspec in specs:
+            validator.compile(configspec)
+
+    def clear(self):
+        """Forget every configspec."""
+        with self._lock:
+            self._specs.clear()
+
+
+# the registry used by ConfigObj when ``shared_configspec`` is set
+configspec_registry = ConfigspecRegistry()
+
+
+# value types ``ValidationCache`` fingerprints
+_FINGERPRINT_TYPES = (str, int, float, bool, type(None))
+
+
+def _fingerprint(value):
+    """
+    ``value`` as it is put in a ``ValidationCache`` key: strings as they
+    are, and other values tagged with their type (so that ``1``, ``1.0``
+    and ``True`` are told apart). ``MISSING`` if it isn't of a type that
+    only compares equal to the same value.
+    """
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind in _FINGERPRINT_TYPES:
+        return kind.__name__, value
+    if kind is list or kind is tuple:
+        items = []
+        for item in value:
+            if type(item) is str:
+                items.append(item)
+            elif type(item) in _FINGERPRINT_TYPES:
+                items.append((type(item).__name__, item))
+            else:
+                return MISSING
+        return kind.__name__, tuple(items)
+    return MISSING
+
+
+def _stored_value(value):
+    """
+    ``value``, from the outcome of a check, as a ``ValidationCache`` keeps
+    it, and whether it must be copied when handed out. ``MISSING`` if it
+    can't be kept.
+    """
+    kind = type(value)
+    if kind in _FINGERPRINT_TYPES:
+        return value, False
+    if kind is list or kind is tuple:
+        if not all([type(item) in _FINGERPRINT_TYPES for item in value]):
+            return MISSING
+        if kind is tuple:
+            return value, False
+        # kept as a tuple, so that it is never handed out itself
+        return _StoredList(value), True
+    if isinstance(value, BaseException):
+        # kept pickled, without the traceback it carries
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return MISSING
+        return _StoredError(data), True
+    return MISSING
+
+
+def _handed_value(value):
+    """A value kept by ``ValidationCache``, copied if it must be."""
+    if type(value) is _StoredList:
+        return list(value)
+    if type(value) is _StoredError:
+        return pickle.loads(value)
+    return value
+
+
+class _StoredList(tuple):
+    """A list from the outcome of a check, kept by ``ValidationCache``."""
+
+    __slots__ = ()
+
+
+class _StoredError(bytes):
+    """An error from a check, kept pickled by ``ValidationCache``."""
+
+    __slots__ = ()
+
+
+class ValidationCache(object):
+    """
+    The outcome of the checks of each section ``validate`` is given it for,
+    keyed by a fingerprint of the values read, their checks and the check
+    functions of the validator. A section whose values and checks haven't
+    changed (after a ``reload``, or in another ConfigObj read from the same
+    file) is not checked again.
+
+    At most ``maxsize`` sections are kept in memory (``None`` for no limit),
+    the least recently used being dropped first. If ``path`` is given, it is
+    a directory in which every outcome is also kept as a file (named by a
+    sha1 hash of the fingerprint), so that several processes can share
+    them. The files are pickles, so the directory must only be writable by
+    those you trust.
+    """
+
+    def __init__(self, path=None, maxsize=VALIDATION_CACHE_SIZE):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        if path is not None and not os.path.isdir(path):
+            os.makedirs(path)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        """Forget the outcomes kept in memory (files are left alone)."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def _validator_key(self, validator):
+        """What the outcomes of ``validator`` depend on, besides the checks."""
+        functions = getattr(validator, 'functions', {})
+        names = []
+        for name in sorted(functions):
+            function = functions[name]
+            names.append((name, getattr(function, '__module__', None),
+                          getattr(function, '__qualname__',
+                                  type(function).__name__)))
+        error = getattr(validator, 'baseErrorClass', None)
+        return repr((VALIDATION_CACHE_VERSION, type(validator).__name__,
+                     getattr(error, '__name__', None), names))
+
+    def _key(self, prefix, entries):
+        """
+        The fingerprint of a section's ``(entry, spec, value, missing,
+        in_configspec)`` entries, a tuple, or ``None`` if a value can't be
+        trusted to be fingerprinted.
+        """
+        key = [prefix]
+        for entry, spec, value, missing, in_configspec in entries:
+            if type(spec) is not str:
+                spec = _fingerprint(spec)
+                if spec is MISSING:
+                    return None
+            if type(value) is not str:
+                value = _fingerprint(value)
+                if value is MISSING:
+                    return None
+            key.append((entry, spec, value, missing, in_configspec))
+        return tuple(key)
+
+    def _filename(self, key):
+        data = repr(key).encode('utf-8', 'backslashreplace')
+        return os.path.join(self.path, hashlib.sha1(data).hexdigest())
+
+    def get(self, key):
+        """The outcomes stored under ``key``, or ``None``."""
+        with self._lock:
+            stored = self._data.get(key)
+            if stored is not None:
+                self._data.move_to_end(key)
+        if stored is None and self.path is not None:
+            try:
+                with open(self._filename(key), 'rb') as h:
+                    stored = self._store(pickle.load(h))
+            except Exception:
+                # not there, or a damaged file
+                pass
+            else:
+                if stored is not None:
+                    self._remember(key, stored)
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if stored is None:
+            return None
+        outcomes, copied = stored
+        if not copied:
+            return outcomes
+        outcomes = list(outcomes)
+        for index in copied:
+            has_default, default, ok, check = outcomes[index]
+            outcomes[index] = (has_default, _handed_value(default), ok,
+                               _handed_value(check))
+        return outcomes
+
+    def set(self, key, outcomes):
+        """
+        Store ``outcomes`` under ``key``, if their values are of the types
+        that can be kept.
+        """
+        stored = self._store(outcomes)
+        if stored is None:
+            return
+        self._remember(key, stored)
+        if self.path is not None:
+            filename = self._filename(key)
+            directory, name = os.path.split(filename)
+            fd, temp = tempfile.mkstemp(prefix='.%s.' % name, dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as h:
+                    pickle.dump(outcomes, h, pickle.HIGHEST_PROTOCOL)
+                os.replace(temp, filename)
+            except BaseException:
+                if os.path.exists(temp):
+                    os.remove(temp)
+                raise
+
+    def _store(self, outcomes):
+        """
+        ``outcomes`` as they are kept in memory: unpickled, and with the
+        indexes of the ones holding values that must be copied when handed
+        out. ``None`` if they can't be kept.
+        """
+        kept = []
+        copied = []
+        for outcome in outcomes:
+            has_default, default, ok, check = outcome
+            default_kept = _stored_value(default)
+            check_kept = _stored_value(check)
+            if default_kept is MISSING or check_kept is MISSING:
+                return None
+            if default_kept[1] or check_kept[1]:
+                copied.append(len(kept))
+                outcome = (has_default, default_kept[0], ok, check_kept[0])
+            kept.append(outcome)
+        return tuple(kept), tuple(copied)
+
+    def _remember(self, key, stored):
+        with self._lock:
+            self._data[key] = stored
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+
+class _AutoSave(object):
+    """The background thread behind ``ConfigObj.autosave``."""
+
+    def __init__(self, config, delay):
+        self.config = config
+        self.delay = delay
+        # held by the methods that change the config, and while it is read
+        # for saving
+        self.lock = threading.RLock()
+        # held while the file is being written
+        self.write_lock = threading.Lock()
+        self.condition = threading.Condition()
+        # when the last unsaved change was made
+        self.last_change = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run,
+                                       name='ConfigObj autosave')
+        self.thread.daemon = True
+        self.thread.start()
+        # the thread is a daemon, so save what is left when the program exits
+        atexit.register(config.flush)
+
+    def changed(self, path):
+        with self.condition:
+            self.last_change = time.time()
+            self.condition.notify()
+
+    def stop(self):
+        atexit.unregister(self.config.flush)
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+
+    def run(self):
+        condition = self.condition
+        with condition:
+            while not self.stopped:
+                if self.last_change is None:
+                    condition.wait()
+                    continue
+                remaining = self.last_change + self.delay - time.time()
+                if remaining > 0:
+                    condition.wait(remaining)
+                    continue
+                # quiet for long enough, so save - without blocking changes
+                self.last_change = None
+                condition.release()
+                try:
+                    self.config.flush()
+                except Exception as e:
+                    # still unsaved, so tried again after the next change (or
+                    # by ``flush``)
+                    warnings.warn('Autosave of "%s" failed: %s' %
+                                  (self.config.filename, e))
+                finally:
+                    condition.acquire()
+
+
 class ConfigObj(Section):
     """An object to read, create, and write config files."""
 
@@ -1136,11 +2572,17 @@ class ConfigObj(Section):
         'true': True, 'false': False,
         }
 
+    # the attributes ConfigObj gives itself and its sections, worked out by
+    # ``_has_own_attributes`` when first needed
+    _known_attributes = None
+
     def __init__(self, infile=None, options=None, configspec=None, encoding=None,
                  interpolation=True, raise_errors=False, list_values=True,
                  create_empty=False, file_error=False, stringify=True,
                  indent_type=None, default_encoding=None, unrepr=False,
-                 write_empty_values=False, _inspec=False):
+                 write_empty_values=False, path_index=False,
+                 incremental_write=False, keep_comments=True,
+                 shared_configspec=False, _inspec=False):
         """
         Parse a config file or create a config file object.
         
@@ -1148,9 +2590,17 @@ class ConfigObj(Section):
                     interpolation=True, raise_errors=False, list_values=True,
                     create_empty=False, file_error=False, stringify=True,
                     indent_type=None, default_encoding=None, unrepr=False,
-                    write_empty_values=False, _inspec=False)``
+                    write_empty_values=False, path_index=False,
+                    incremental_write=False, keep_comments=True,
+                    shared_configspec=False, _inspec=False)``
         """
         self._inspec = _inspec
+        # change callbacks, keyed by path
+        self._subscribers = {}
+        # the background writer, when autosave is on
+        self._autosave = None
+        # defaults shared by the sections validated with ``virtual_defaults``
+        self._default_maps = {}
         # init the superclass
         Section.__init__(self, self, 0, self)
         
@@ -1162,12 +2612,15 @@ class ConfigObj(Section):
                     'create_empty': create_empty, 'file_error': file_error,
                     'stringify': stringify, 'indent_type': indent_type,
                     'default_encoding': default_encoding, 'unrepr': unrepr,
-                    'write_empty_values': write_empty_values}
+                    'write_empty_values': write_empty_values,
+                    'path_index': path_index,
+                    'incremental_write': incremental_write,
+                    'keep_comments': keep_comments,
+                    'shared_configspec': shared_configspec}
 
         if options is None:
             options = _options
         else:
-            import warnings
             warnings.warn('Passing in an options dictionary to ConfigObj() is '
                           'deprecated. Use **options instead.',
                           DeprecationWarning, stacklevel=2)
@@ -1283,6 +2736,9 @@ class ConfigObj(Section):
             raise error
         # delete private attributes
         del self._errors
+        if self.incremental_write:
+            self._source_lines = infile
+            self._source_format = self._write_format()
         
         if configspec is None:
             self.configspec = None
@@ -1309,6 +2765,22 @@ class ConfigObj(Section):
         self.newlines = None
         self.write_empty_values = options['write_empty_values']
         self.unrepr = options['unrepr']
+        self.path_index = options['path_index']
+        # maps full paths to (section, key); None until built
+        if self.path_index:
+            self._path_index = {}
+        else:
+            self._path_index = None
+        self.incremental_write = options['incremental_write']
+        self.keep_comments = options['keep_comments']
+        self.shared_configspec = options['shared_configspec']
+        # the generation last written to ``filename``
+        self._saved_generation = None
+        # set once any section has been shared with a clone
+        self._lent = False
+        # the lines read, and the settings that affect how they are written
+        self._source_lines = None
+        self._source_format = None
         
         self.initial_comment = []
         self.final_comment = []
@@ -1330,6 +2802,357 @@ class ConfigObj(Section):
                 ', '.join([('%s: %s' % (repr(key), repr(_getval(key)))) 
                 for key in (self.scalars + self.sections)]))
     
+    def clone(self):
+        """
+        Return a copy-on-write copy of the ConfigObj.
+
+        The clone has the same options, comments and configspec. See
+        ``Section.clone`` for how subsections are shared.
+        """
+        options = {}
+        for entry in OPTION_DEFAULTS:
+            if entry == 'configspec':
+                continue
+            options[entry] = getattr(self, entry)
+        options['configspec'] = self._original_configspec
+
+        new = self._blank(options, self._inspec)
+        new.filename = self.filename
+        new.BOM = self.BOM
+        new.newlines = self.newlines
+        new.initial_comment = list(self.initial_comment)
+        new.final_comment = list(self.final_comment)
+        new._original_configspec = self._original_configspec
+        new._source_lines = self._source_lines
+        new._source_format = self._source_format
+        # the index is built again when it is first used
+        new._path_index = None
+        self._copy_into(new)
+        return new
+
+    @classmethod
+    def _blank(cls, options, _inspec):
+        """An empty instance with the given options, without loading."""
+        new = cls.__new__(cls)
+        new._inspec = _inspec
+        new._subscribers = {}
+        new._autosave = None
+        new._default_maps = {}
+        Section.__init__(new, new, 0, new)
+        new._initialise(options)
+        del new._errors
+        return new
+
+    def __reduce__(self):
+        if self._has_own_attributes():
+            # attributes (of a subclass, or set by the caller) that ``dumps``
+            # doesn't store, so pickle every attribute
+            return Section.__reduce__(self)
+        try:
+            data = self.dumps()
+        except ValueError:
+            # something ``dumps`` can't handle, so pickle every attribute
+            return Section.__reduce__(self)
+        return (self.__class__.loads, (data,))
+
+    def _has_own_attributes(self):
+        """
+        Whether the ConfigObj or one of its sections has attributes that
+        ConfigObj doesn't give it itself.
+        """
+        known = ConfigObj._known_attributes
+        if known is None:
+            blank = ConfigObj(['', '[section]'])
+            # the others are made when first needed
+            known = ConfigObj._known_attributes = frozenset(
+                list(blank.__dict__) + list(blank['section'].__dict__) +
+                ['_interpolation_engine', '_vdtMissingValue'])
+        stack = [self]
+        while stack:
+            section = stack.pop()
+            if not known.issuperset(section.__dict__):
+                return True
+            stack.extend([dict.__getitem__(section, entry)
+                          for entry in section.sections])
+        return False
+
+    def dumps(self):
+        """
+        Serialize the ConfigObj to a compact byte string. ``ConfigObj.loads``
+        turns it back into a ConfigObj. This is also what is used to pickle a
+        ConfigObj.
+
+        Values, comments, defaults, options and the configspec are stored,
+        with the sections written one after another rather than nested. The
+        links between sections are rebuilt on loading, and repeated keys and
+        strings are only stored once. Missing values read from the defaults
+        (see ``virtual_defaults`` in ``validate``) stay missing, and are read
+        from the defaults again once loaded.
+
+        Values must be of the basic Python types (strings, numbers, booleans,
+        ``None`` and lists, tuples and dictionaries of them), otherwise
+        ``ValueError`` is raised.
+        """
+        strings = {}
+        def share(value):
+            if isinstance(value, str):
+                return strings.setdefault(value, value)
+            if isinstance(value, list):
+                return [share(entry) for entry in value]
+            if isinstance(value, tuple):
+                return tuple([share(entry) for entry in value])
+            return value
+        def share_dict(mapping):
+            return dict([(share(key), share(value))
+                         for key, value in mapping.items()])
+
+        spec = self.configspec
+        if isinstance(spec, ConfigObj):
+            spec_data = spec.dumps()
+        elif spec is None:
+            spec_data = None
+        else:
+            raise ValueError('Cannot serialize the configspec.')
+        original = self._original_configspec
+        original_is_spec = original is spec and spec is not None
+        if original_is_spec:
+            original = None
+
+        # the sections in depth first order, each followed by its subsections
+        records = []
+        # the defaults shared by sections validated with ``virtual_defaults``,
+        # stored once so that ``loads`` shares them again
+        shared_defaults = {}
+        stack = [self]
+        while stack:
+            section = stack.pop()
+            configspec = section.configspec
+            if configspec is None:
+                spec_path = None
+            elif spec is not None and configspec.main is spec:
+                spec_path = share(configspec._path())
+            else:
+                raise ValueError('Cannot serialize the configspec of "%s".' %
+                                 section.name)
+            virtual = section._virtual_defaults is not None
+            if virtual:
+                key = id(section.default_values)
+                default_values = shared_defaults.get(key)
+                if default_values is None:
+                    default_values = shared_defaults[key] = share_dict(
+                        section.default_values)
+            else:
+                default_values = share_dict(section.default_values)
+            records.append((
+                share(section.scalars),
+                [share(dict.__getitem__(section, entry))
+                 for entry in section.scalars],
+                share(section.sections),
+                share_dict(section.comments),
+                share_dict(section.inline_comments),
+                share(section.defaults),
+                default_values,
+                share(section.extra_values),
+                spec_path,
+                section._created,
+                virtual))
+            stack.extend([dict.__getitem__(section, entry)
+                          for entry in reversed(section.sections)])
+
+        options = {}
+        for entry in OPTION_DEFAULTS:
+            if entry != 'configspec':
+                options[entry] = getattr(self, entry)
+        header = (DUMPS_VERSION, options, self._inspec, self.filename,
+                  self.BOM, self.newlines, share(self.initial_comment),
+                  share(self.final_comment), original, original_is_spec,
+                  spec_data)
+        return marshal.dumps((header, records))
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Create a ConfigObj from a byte string made by ``dumps``.
+
+        Raises ``ValueError`` if the data isn't in the expected format.
+        """
+        try:
+            header, records = marshal.loads(data)
+            (version, stored, _inspec, filename, BOM, newlines,
+             initial_comment, final_comment, original, original_is_spec,
+             spec_data) = header
+        except (EOFError, TypeError, ValueError):
+            raise ValueError('Not data written by ConfigObj.dumps.')
+        if version != DUMPS_VERSION:
+            raise ValueError('Unsupported dumps format version "%s".' %
+                             version)
+
+        options = dict(OPTION_DEFAULTS)
+        options.update(stored)
+        new = cls._blank(options, _inspec)
+        new.filename = filename
+        new.BOM = BOM
+        new.newlines = newlines
+        new.initial_comment = initial_comment
+        new.final_comment = final_comment
+        if spec_data is None:
+            spec = None
+        else:
+            spec = ConfigObj.loads(spec_data)
+        if original_is_spec:
+            original = spec
+        new._original_configspec = original
+        # the index is built when it is first used
+        new._path_index = None
+
+        records = iter(records)
+        def fill(section):
+            (scalars, values, sections, comments, inline_comments, defaults,
+             default_values, extra_values, spec_path, created,
+             virtual) = next(records)
+            dict.update(section, zip(scalars, values))
+            section.scalars = scalars
+            section.sections = sections
+            if new.keep_comments:
+                section.comments = comments
+                section.inline_comments = inline_comments
+            section.defaults = defaults
+            section.default_values = default_values
+            if virtual:
+                section._virtual_defaults = default_values
+            section.extra_values = extra_values
+            if spec_path is None:
+                section.configspec = None
+            elif spec_path:
+                section.configspec = spec.get_path(spec_path)
+            else:
+                section.configspec = spec
+            section._created = created
+            return iter(sections)
+
+        stack = [(new, fill(new))]
+        while stack:
+            parent, names = stack[-1]
+            name = next(names, None)
+            if name is None:
+                stack.pop()
+                continue
+            section = Section(parent, parent.depth + 1, new, name=name)
+            dict.__setitem__(parent, name, section)
+            stack.append((section, fill(section)))
+        return new
+
+    def to_shared_memory(self, name=None):
+        """
+        Write the config into a new ``multiprocessing.shared_memory`` block,
+        and return the ``SharedMemory`` object.
+
+        Other processes read it with ``SharedConfig(name)``, so a config is
+        held in memory once however many processes use it. Values are
+        interpolated as they are written, and must be of the types ``dumps``
+        supports. The caller owns the block, and should ``close`` and
+        ``unlink`` it when it is no longer needed.
+        """
+        from multiprocessing import shared_memory
+        data = _shared_layout(self)
+        block = shared_memory.SharedMemory(name=name, create=True,
+                                           size=len(data))
+        block.buf[:len(data)] = data
+        _shared_blocks.add(block.name)
+        return block
+
+    def get_path(self, path):
+        """
+        Fetch a value (or section) by its full path, a sequence of section
+        names ending with the key. Raises ``KeyError`` if it doesn't exist.
+
+        With the ``path_index`` option set this is a single dictionary lookup
+        rather than a lookup per level.
+
+        >>> a = ConfigObj({'svc': {'db': {'host': 'localhost'}}})
+        >>> a.get_path(('svc', 'db', 'host'))
+        'localhost'
+        """
+        path = tuple(path)
+        if not path:
+            raise KeyError(path)
+        if self.path_index:
+            index = self._path_index
+            if index is None:
+                index = self._path_index = {}
+                self._index_members(index, ())
+            found = index.get(path)
+            if found is not None and found[0].main is self:
+                section, key = found
+                return section[key]
+            # not indexed (a missing value read from the defaults with
+            # ``virtual_defaults``), or in a subsection this clone still
+            # shares: fetched (and copied) level by level below
+        section = self
+        for name in path[:-1]:
+            section = section[name]
+            if not isinstance(section, Section):
+                raise KeyError(path)
+        return section[path[-1]]
+
+    def subscribe(self, path, callback):
+        """
+        Call ``callback(changed_path)`` whenever the value or section at
+        ``path`` (a sequence of names, as for ``get_path``) is changed. For a
+        section this includes changes to anything below it; an empty path
+        subscribes to every change. The path doesn't have to exist yet.
+
+        >>> a = ConfigObj()
+        >>> a.subscribe(('svc',), print)
+        >>> a['svc'] = {}
+        ('svc',)
+        >>> a['svc']['port'] = '80'
+        ('svc', 'port')
+        """
+        self._subscribers.setdefault(tuple(path), []).append(callback)
+
+    def unsubscribe(self, path, callback):
+        """
+        Remove a callback added with ``subscribe``.
+
+        Raises ``ValueError`` if it isn't subscribed to ``path``.
+        """
+        path = tuple(path)
+        callbacks = self._subscribers.get(path, [])
+        if callback not in callbacks:
+            raise ValueError('Callback not subscribed to "%s".' % (path,))
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._subscribers[path]
+
+    def _notify(self, path):
+        length = len(path)
+        for entry, callbacks in list(self._subscribers.items()):
+            # a change to a member of a section, or to a section that
+            # contains the member
+            if path[:len(entry)] == entry or entry[:length] == path:
+                for callback in list(callbacks):
+                    callback(path)
+
+    def iter_paths(self, prefix=()):
+        """
+        Yield the full path of every value and section below ``prefix`` (a
+        path to a section), in the same order as ``iter_walk``.
+
+        >>> a = ConfigObj({'a': '1', 'svc': {'db': {'host': 'localhost'}}})
+        >>> list(a.iter_paths())
+        [('a',), ('svc',), ('svc', 'db'), ('svc', 'db', 'host')]
+        """
+        prefix = tuple(prefix)
+        if prefix:
+            section = self.get_path(prefix)
+            if not isinstance(section, Section):
+                raise KeyError(prefix)
+        else:
+            section = self
+        for path, section, key in section._walk_members(True, True):
+            yield prefix + path + (key,)
+    
     def _handle_bom(self, infile):
         """
         Handle any BOM, and decode if necessary.
@@ -1484,6 +3307,29 @@ class ConfigObj(Section):
         else:
             return value
 
+    def _same_text(self, value, raw):
+        """
+        Whether ``value``, which replaces the value ``raw`` that was read,
+        would be written out as the same text.
+        """
+        if isinstance(raw, list):
+            return (isinstance(value, (list, tuple)) and
+                    len(value) == len(raw) and
+                    all([self._str(entry) == old
+                         for entry, old in zip(value, raw)]))
+        return (isinstance(raw, str) and
+                not isinstance(value, (list, tuple)) and
+                self._str(value) == raw)
+
+    def _written_as_read(self, value, read):
+        """
+        Whether ``value`` is still written out as the text it was read from,
+        ``read`` being what ``_parse`` kept of it for ``incremental_write``.
+        """
+        if self.unrepr:
+            return repr(value) == read
+        return value is read or self._same_text(value, read)
+
     def _parse(self, infile):
         """Actually parse the config file."""
         
@@ -1497,6 +3343,8 @@ class ConfigObj(Section):
         maxline = len(infile) - 1
         cur_index = -1
         reset_comment = False
+        keep_comments = self.keep_comments
+        keep_spans = self.incremental_write and keep_comments
         
         while cur_index < maxline:
             if reset_comment:
@@ -1507,7 +3355,8 @@ class ConfigObj(Section):
             # do we have anything on the line ?
             if not sline or sline.startswith('#'):
                 reset_comment = False
-                comment_list.append(line)
+                if keep_comments:
+                    comment_list.append(line)
                 continue
             
             if not done_start:
@@ -1564,6 +3413,9 @@ class ConfigObj(Section):
                 parent[sect_name] = this_section
                 parent.inline_comments[sect_name] = comment
                 parent.comments[sect_name] = comment_list
+                if keep_spans:
+                    parent._spans[sect_name] = (cur_index, cur_index + 1,
+                                                comment, None)
                 continue
             #
             # it's not a section marker,
@@ -1581,6 +3433,7 @@ class ConfigObj(Section):
                 (indent, key, value) = mat.groups()
                 if indent and (self.indent_type is None):
                     self.indent_type = indent
+                start_index = cur_index
                 # check for a multiline value
                 if value[:3] in ['"""', "'''"]:
                     try:
@@ -1639,6 +3492,16 @@ class ConfigObj(Section):
                 this_section.__setitem__(key, value, unrepr=True)
                 this_section.inline_comments[key] = comment
                 this_section.comments[key] = comment_list
+                if keep_spans:
+                    if self.unrepr:
+                        read = repr(value)
+                    elif isinstance(value, list):
+                        # a copy, as the list may be changed in place
+                        read = list(value)
+                    else:
+                        read = value
+                    this_section._spans[key] = (start_index, cur_index + 1,
+                                                comment, read)
                 continue
         #
         if self.indent_type is None:
@@ -1736,7 +3599,21 @@ class ConfigObj(Section):
 
         if not value:
             return '""'
+        if _plain_value.fullmatch(value) is not None:
+            # the common case: nothing in it needs quoting
+            return value
+
+        key = (value, multiline, bool(self.list_values), self.__class__)
+        quot = _quote_cache.get(key)
+        if quot is None:
+            quot = self._get_quote(value, multiline)
+            if len(_quote_cache) >= QUOTE_CACHE_SIZE:
+                _quote_cache.clear()
+            _quote_cache[key] = quot
+        return quot % value
 
+    def _get_quote(self, value, multiline):
+        """Pick the quotes for a non empty string value."""
         no_lists_no_quotes = not self.list_values and '\n' not in value and '#' not in value
         need_triple = multiline and ((("'" in value) and ('"' in value)) or ('\n' in value ))
         hash_triple_quote = multiline and not need_triple and ("'" in value) and ('"' in value) and ('#' in value)
@@ -1763,7 +3640,7 @@ class ConfigObj(Section):
         if quot == noquot and '#' in value and self.list_values:
             quot = self._get_single_quote(value)
 
-        return quot % value
+        return quot
 
     def _get_single_quote(self, value):
         if ("'" in value) and ('"' in value):
@@ -1870,17 +3747,11 @@ class ConfigObj(Section):
         # FIXME: Should we check that the configspec was created with the 
         #        correct settings ? (i.e. ``list_values=False``)
         if not isinstance(configspec, ConfigObj):
-            try:
-                configspec = ConfigObj(configspec,
-                                       raise_errors=True,
-                                       file_error=True,
-                                       _inspec=True)
-            except ConfigObjError as e:
-                # FIXME: Should these errors have a reference
-                #        to the already parsed ConfigObj ?
-                raise ConfigspecError('Parsing configspec failed: %s' % e)
-            except IOError as e:
-                raise IOError('Reading configspec failed: %s' % e)
+            if (self.shared_configspec and isinstance(configspec, str) and
+                os.path.isfile(configspec)):
+                configspec = configspec_registry.get(configspec)
+            else:
+                configspec = _parse_configspec(configspec)
 
         self.configspec = configspec
 
@@ -1958,69 +3829,15 @@ class ConfigObj(Section):
         >>> import os
         >>> os.remove('test.ini')
         """
-        if self.indent_type is None:
-            # this can be true if initialised from a dictionary
-            self.indent_type = DEFAULT_INDENT_TYPE
-            
-        out = []
-        cs = '#'
-        csp = '# '
-        if section is None:
-            int_val = self.interpolation
-            self.interpolation = False
-            section = self
-            for line in self.initial_comment:
-                line = self._decode_element(line)
-                stripped_line = line.strip()
-                if stripped_line and not stripped_line.startswith(cs):
-                    line = csp + line
-                out.append(line)
-                
-        indent_string = self.indent_type * section.depth
-        for entry in (section.scalars + section.sections):
-            if entry in section.defaults:
-                # don't write out default values
-                continue
-            for comment_line in section.comments[entry]:
-                comment_line = self._decode_element(comment_line.lstrip())
-                if comment_line and not comment_line.startswith(cs):
-                    comment_line = csp + comment_line
-                out.append(indent_string + comment_line)
-            this_entry = section[entry]
-            comment = self._handle_comment(section.inline_comments[entry])
-            
-            if isinstance(this_entry, dict):
-                # a section
-                out.append(self._write_marker(
-                    indent_string,
-                    this_entry.depth,
-                    entry,
-                    comment))
-                out.extend(self.write(section=this_entry))
-            else:
-                out.append(self._write_line(
-                    indent_string,
-                    entry,
-                    this_entry,
-                    comment))
-                
-        if section is self:
-            for line in self.final_comment:
-                line = self._decode_element(line)
-                stripped_line = line.strip()
-                if stripped_line and not stripped_line.startswith(cs):
-                    line = csp + line
-                out.append(line)
-            self.interpolation = int_val
-            
-        if section is not self:
-            return out
-        
+        if section is not None and section is not self:
+            return list(self._iter_lines(section))
+
         if (self.filename is None) and (outfile is None):
             
             # output a list of lines
             # might need to encode
             # NOTE: This will *screw* UTF16, each line will start with the BOM
+            out = list(self._iter_document())
             if self.encoding:
                 out = [l.encode(self.encoding) for l in out]
             if (self.BOM and ((self.encoding is None) or
@@ -2031,33 +3848,271 @@ class ConfigObj(Section):
                 out[0] = BOM_UTF8 + out[0]
             return out
             
-        
-        # Turn the list to a string, joined with correct newlines
         newline = self.newlines or os.linesep
         if (getattr(outfile, 'mode', None) is not None and outfile.mode == 'w'
             and sys.platform == 'win32' and newline == '\r\n'):
             # Windows specific hack to avoid writing '\r\r\n'
             newline = '\n'
-        output = newline.join(out)
+        if outfile is not None:
+            for chunk in self.iter_write(newline):
+                outfile.write(chunk)
+        else:
+            generation = self.generation
+            h = open(self.filename, 'wb')
+            try:
+                self._write_bytes(h, newline)
+            finally:
+                h.close()
+            self._saved_generation = generation
+
+    def _write_bytes(self, h, newline=None):
+        for chunk in self.iter_write(newline):
+            if isinstance(chunk, str):
+                # encoding the data to bytes
+                chunk = chunk.encode()
+            h.write(chunk)
+
+    def autosave(self, delay=0.5):
+        """
+        Save changes to ``filename`` automatically, from a background thread.
+
+        Changes are written once no more have been made for ``delay``
+        seconds, so a burst of changes is saved with a single write. Each
+        save replaces the file atomically, as ``flush`` does. Pass ``None``
+        to turn autosaving off again (saving anything outstanding first).
+
+        While autosaving, the methods that change the config hold a lock
+        that is also held while the config is read for saving, so a save
+        never sees a change half made. A save that fails is reported with a
+        warning and tried again after the next change. Anything left unsaved
+        is saved when the program exits.
+        """
+        saver = self._autosave
+        if saver is not None:
+            self._autosave = None
+            self.unsubscribe((), saver.changed)
+            saver.stop()
+        if delay is None:
+            if saver is not None:
+                self.flush()
+            return
+        if not isinstance(self.filename, str):
+            raise ValueError('Autosave needs the filename attribute set.')
+        saver = self._autosave = _AutoSave(self, delay)
+        self.subscribe((), saver.changed)
+
+    def flush(self):
+        """
+        Write any changes not yet saved to ``filename``.
+
+        The config is written to a temporary file in the same directory,
+        which is synced to disk and then renamed over the original. Readers
+        of the file see either the old or the new version, never part of
+        one.
+        """
+        if not isinstance(self.filename, str):
+            raise ValueError('Flush needs the filename attribute set.')
+        saver = self._autosave
+        if saver is None:
+            self._save(self._snapshot())
+            return
+        # changes are only held off while the config is read, not while the
+        # file is written
+        with saver.lock:
+            snapshot = self._snapshot()
+        with saver.write_lock:
+            self._save(snapshot)
+
+    def _snapshot(self):
+        """
+        Return the generation of the config and the contents of the file for
+        it, or ``None`` if that generation has already been saved.
+        """
+        generation = self.generation
+        if generation == self._saved_generation:
+            return None
+        h = BytesIO()
+        self._write_bytes(h)
+        return generation, h.getvalue()
+
+    def _save(self, snapshot):
+        """
+        Atomically replace ``filename`` with a ``snapshot`` from
+        ``_snapshot``, unless the same or a later generation has been
+        written since it was taken.
+        """
+        if snapshot is None:
+            return
+        generation, data = snapshot
+        saved = self._saved_generation
+        if saved is not None and generation <= saved:
+            return
+        filename = os.path.abspath(self.filename)
+        directory, name = os.path.split(filename)
+        fd, temp = tempfile.mkstemp(prefix='.%s.' % name, dir=directory)
+        try:
+            h = os.fdopen(fd, 'wb')
+            try:
+                h.write(data)
+                h.flush()
+                os.fsync(h.fileno())
+            finally:
+                h.close()
+            if os.path.exists(filename):
+                os.chmod(temp, os.stat(filename).st_mode & 0o7777)
+            os.replace(temp, filename)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        self._saved_generation = generation
+
+    def iter_write(self, newline=None):
+        """
+        Yield the config file in chunks, as ``write`` would write it to a
+        file. The chunks are bytes if the ``encoding`` attribute is set, and
+        strings otherwise.
+
+        ``newline`` defaults to the ``newlines`` attribute, or ``os.linesep``
+        if that isn't set.
+
+        The whole file is never held in memory, and values are read without
+        interpolation, so the config can still be used while this is in
+        progress.
+        """
+        if newline is None:
+            newline = self.newlines or os.linesep
+        encoder = None
         if self.encoding:
-            output = output.encode(self.encoding)
-            
+            encoder = getincrementalencoder(self.encoding)()
         if self.BOM and ((self.encoding is None) or match_utf8(self.encoding)):
             # Add the UTF8 BOM
-            output = BOM_UTF8 + output
-              
-        if not output.endswith(newline):
+            if encoder is None:
+                yield BOM_UTF8.decode('utf_8')
+            else:
+                yield BOM_UTF8
+
+        chunk = []
+        size = 0
+        # the end of the output so far, to see if it ends with a newline
+        tail = ''
+        separator = ''
+        for line in self._iter_document():
+            chunk.append(separator)
+            chunk.append(line)
+            separator = newline
+            size += len(line)
+            if size >= WRITE_CHUNK_SIZE:
+                output = ''.join(chunk)
+                tail = output[-len(newline):]
+                chunk = []
+                size = 0
+                if encoder is not None:
+                    output = encoder.encode(output)
+                yield output
+        output = ''.join(chunk)
+        if not (tail + output).endswith(newline):
             output += newline
-        if outfile is not None:
-            outfile.write(output)
-        else:
-            h = open(self.filename, 'wb')
-            output = output.encode() # encoding the data to bytes
-            h.write(output)
-            h.close()
+        if encoder is not None:
+            output = encoder.encode(output, True)
+        if output:
+            yield output
+
+    def _iter_document(self):
+        """Yield every line of the file, including the initial and final
+        comments (as strings, without newlines)."""
+        for line in self._iter_comment(self.initial_comment):
+            yield line
+        for line in self._iter_lines(self):
+            yield line
+        for line in self._iter_comment(self.final_comment):
+            yield line
+
+    def _write_format(self):
+        """The settings that change how values are written."""
+        return (self.indent_type, self.list_values, self.unrepr,
+                self.write_empty_values)
+
+    def _iter_comment(self, lines):
+        cs = '#'
+        csp = '# '
+        for line in lines:
+            line = self._decode_element(line)
+            stripped_line = line.strip()
+            if stripped_line and not stripped_line.startswith(cs):
+                line = csp + line
+            yield line
+
+    def _iter_lines(self, section):
+        """Yield the lines for the members of ``section``, and of the
+        sections below it."""
+        if self.indent_type is None:
+            # this can be true if initialised from a dictionary
+            self.indent_type = DEFAULT_INDENT_TYPE
+        cs = '#'
+        csp = '# '
+        keep_comments = self.keep_comments
+        source = self._source_lines
+        if source is not None and self._source_format != self._write_format():
+            # the lines read would now be written differently
+            source = None
+        stack = [(section, iter(section.scalars + section.sections))]
+        while stack:
+            section, entries = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+            if entry in section.defaults:
+                # don't write out default values
+                continue
+            indent_string = self.indent_type * section.depth
+            if keep_comments:
+                for comment_line in section.comments[entry]:
+                    comment_line = self._decode_element(comment_line.lstrip())
+                    if comment_line and not comment_line.startswith(cs):
+                        comment_line = csp + comment_line
+                    yield indent_string + comment_line
+            # the raw value, without interpolation
+            this_entry = dict.__getitem__(section, entry)
+            span = None
+            if source is not None and section.main is self:
+                span = section._spans.get(entry)
+            if (span is not None and
+                    span[2] == section.inline_comments[entry] and
+                    (isinstance(this_entry, Section) or
+                     self._written_as_read(this_entry, span[3]))):
+                # unchanged since it was read, so write it out as it was
+                for line in source[span[0]:span[1]]:
+                    yield self._decode_element(line)
+                if isinstance(this_entry, Section):
+                    stack.append((this_entry,
+                                  iter(this_entry.scalars + this_entry.sections)))
+                continue
+            if keep_comments:
+                comment = self._handle_comment(section.inline_comments[entry])
+            else:
+                comment = ''
+            
+            if isinstance(this_entry, Section):
+                # a section
+                yield self._write_marker(
+                    indent_string,
+                    this_entry.depth,
+                    entry,
+                    comment)
+                stack.append((this_entry,
+                              iter(this_entry.scalars + this_entry.sections)))
+            else:
+                yield self._write_line(
+                    indent_string,
+                    entry,
+                    this_entry,
+                    comment)
     
     def validate(self, validator, preserve_errors=False, copy=False,
-                 section=None):
+                 section=None, executor=None, fail_fast=False,
+                 virtual_defaults=False, cache=None):
         """
         Test the ConfigObj against a configspec.
         
@@ -2091,120 +4146,361 @@ class ConfigObj(Section):
         You can then use the ``flatten_errors`` function to turn your nested
         results dictionary into a flattened list of failures - useful for
         displaying meaningful error messages.
+        
+        If ``executor`` is given (a ``concurrent.futures`` thread or process
+        pool) the checks are run in the pool, in batches of whole sections.
+        Every value is read before any is converted, and the results are
+        then stored in the same order as without an executor. With a process
+        pool the validator (and its check functions) must be picklable.
+        
+        If ``fail_fast`` is ``True``, validation stops at the first failure
+        and, instead of the results dictionary, ``validate`` returns ``True``
+        or a ``(section_list, key, error)`` tuple for that failure (like the
+        ones ``flatten_errors`` gives). Values checked before the failure
+        are converted, the rest are left alone. ``fail_fast`` can't be used
+        with an executor.
+        
+        If ``virtual_defaults`` is ``True``, missing values are not set from
+        their defaults. Reading a missing value (with ``section[key]``,
+        ``get`` or the ``as_*`` methods) gives its default instead, but it
+        isn't a member of the section: it is not in ``scalars``, ``keys()``
+        or ``defaults``, and is left out of ``write``, ``dict``, ``freeze``
+        and ``to_shared_memory``. A ``clone``, or a copy made with ``dumps``
+        (or pickled), reads it from the defaults too. ``default_values`` is
+        shared by all the sections validated against the same configspec
+        section, so it must not be changed. ``virtual_defaults`` can't be used with an
+        executor.
+        
+        If ``cache`` (a ``ValidationCache``) is given, the outcome of the
+        checks of each section is looked up in it, and only checked (and
+        stored in it) if it isn't there. As with an executor, all the values
+        of a section are then read before any is converted. ``cache`` can't
+        be used with an executor.
         """
         if section is None:
-            if self.configspec is None:
-                raise ValueError('No configspec supplied.')
-            if preserve_errors:
-                # We do this once to remove a top level dependency on the validate module
-                # Which makes importing configobj faster
-                from validate import VdtMissingValue
-                self._vdtMissingValue = VdtMissingValue
-                
+            self._validate_start(preserve_errors, copy)
             section = self
-
-            if copy:
-                section.initial_comment = section.configspec.initial_comment
-                section.final_comment = section.configspec.final_comment
-                section.encoding = section.configspec.encoding
-                section.BOM = section.configspec.BOM
-                section.newlines = section.configspec.newlines
-                section.indent_type = section.configspec.indent_type
-            
         #
         # section.default_values.clear() #??
-        configspec = section.configspec
-        self._set_configspec(section, copy)
-    
-        def validate_entry(entry, spec, val, missing, ret_true, ret_false):
-            section.default_values.pop(entry, None)
+        if executor is not None:
+            if fail_fast:
+                raise ValueError('fail_fast can not be used with an executor.')
+            if virtual_defaults:
+                raise ValueError(
+                    'virtual_defaults can not be used with an executor.')
+            if cache is not None:
+                raise ValueError('cache can not be used with an executor.')
+            return self._validate_executor(validator, preserve_errors, copy,
+                                           section, executor)
+        if cache is not None:
+            cache = (cache, cache._validator_key(validator))
+        return self._validate_section(validator, section, preserve_errors,
+                                      copy, False, fail_fast,
+                                      virtual_defaults, cache)
+
+    def revalidate(self, validator, preserve_errors=False, copy=False):
+        """
+        Validate, only checking what has changed since the last time.
+        
+        ``revalidate`` takes the same arguments and returns the same results
+        as ``validate``, but remembers the outcome of every check, along with
+        the value and the check it came from. The next time, it only applies
+        the checks of values that were changed, added or removed (or whose
+        check changed) since then. Sections in which nothing changed are
+        skipped altogether, unless they hold values that are interpolated.
+        
+        ``validate`` doesn't remember anything, so the first ``revalidate``
+        checks everything. Outcomes are also only reused when ``revalidate``
+        is given the same validator, ``preserve_errors`` and ``copy`` as the
+        time before. What is remembered about a section is kept on it, and
+        goes when it is deleted or replaced.
+        """
+        self._validate_start(preserve_errors, copy)
+        return self._validate_section(validator, self, preserve_errors, copy,
+                                      True)
+
+    def _validate_start(self, preserve_errors, copy):
+        """Get the ConfigObj ready for validating it as a whole."""
+        if self.configspec is None:
+            raise ValueError('No configspec supplied.')
+        if preserve_errors:
+            # We do this once to remove a top level dependency on the validate module
+            # Which makes importing configobj faster
+            from validate import VdtMissingValue
+            self._vdtMissingValue = VdtMissingValue
+
+        if copy:
+            self.initial_comment = self.configspec.initial_comment
+            self.final_comment = self.configspec.final_comment
+            self.encoding = self.configspec.encoding
+            self.BOM = self.configspec.BOM
+            self.newlines = self.configspec.newlines
+            self.indent_type = self.configspec.indent_type
+
+    def _validate_section(self, validator, section, preserve_errors, copy,
+                          reuse, fail_fast=False, virtual=False, cache=None):
+        """
+        Validate ``section``, and the sections below it, without an executor.
+        
+        If ``reuse`` is set, for ``revalidate``, then remembered outcomes are
+        used again, and what is found is remembered. If ``fail_fast`` is set
+        no results dictionaries are built: the first failure is returned as
+        ``(section_list, key, error)``, and ``True`` otherwise. If ``virtual``
+        is set
+        missing values are read from the defaults rather than set. ``cache``
+        is a ``ValidationCache`` and the key of the validator in it, or
+        ``None``.
+        """
+        options = (validator, preserve_errors, copy, virtual)
+        path = section._path()
+        known = {}
+        if reuse:
+            memo = section._validation_memo
+            if memo is not None and memo.options == options:
+                known = memo.entries
+        unvalidated, incorrect, entries = self._validate_entries(section,
+                                                                 copy)
+        if virtual:
+            section.default_values = section._virtual_defaults = (
+                self._shared_defaults(validator, section.configspec))
+        key = cached = None
+        checked = []
+        if cache is not None:
+            entries = list(entries)
+            key = cache[0]._key(cache[1], entries)
+            if key is not None:
+                cached = cache[0].get(key)
+                if cached is not None:
+                    cached = iter(cached)
+        # tell a profiling validator what it is checking
+        profiler = getattr(validator, 'profiler', None)
+        out = None if fail_fast else {}
+        remembered = {}
+        depends = False
+        ret_true = True
+        ret_false = True
+        for entry, spec, val, missing, in_configspec in entries:
+            memo = outcome = None
+            if reuse:
+                raw = dict.get(section, entry, MISSING)
+                memo = known.get(entry)
+                if memo is not None and not memo.matches(spec, raw, val,
+                                                         missing):
+                    if memo.matches_read(spec, raw, val, missing):
+                        # the value checked last time, but not converted (as
+                        # after a ``reload``), so only the storing is redone
+                        outcome = memo.stored_outcome()
+                    memo = None
+            if memo is not None:
+                check = memo.restore(section, entry, copy)
+            else:
+                if outcome is not None:
+                    pass
+                elif cached is not None:
+                    outcome = next(cached)
+                else:
+                    if profiler is not None:
+                        profiler.locate((path, entry))
+                    outcome = _validate_scalar(validator, spec, val, missing,
+                                               in_configspec)
+                    checked.append(outcome)
+                check = self._validate_store(section, entry, val, missing,
+                                             outcome, preserve_errors, copy,
+                                             virtual)
+                if reuse:
+                    memo = _EntryMemo(section, entry, spec, raw, val, missing,
+                                      outcome, check)
+            if fail_fast:
+                if check is not True:
+                    if profiler is not None:
+                        profiler.locate(None)
+                    return list(path), entry, check
+                continue
+            out[entry] = check
+            ret_true, ret_false = _validate_flags(check, ret_true, ret_false)
+            if reuse:
+                remembered[entry] = memo
+                depends = depends or memo.interpolated
+        if profiler is not None:
+            profiler.locate(None)
+        if key is not None and cached is None:
+            cache[0].set(key, checked)
+        if fail_fast:
+            if incorrect != ([], []):
+                entry = (incorrect[0] + incorrect[1])[0]
+                found = {}
+                self._validate_incorrect(validator, incorrect, found, True,
+                                         True, preserve_errors)
+                return list(path), entry, found[entry]
+        else:
+            ret_true, ret_false = self._validate_incorrect(
+                validator, incorrect, out, ret_true, ret_false,
+                preserve_errors)
 
+        # Missing sections will have been created as empty ones when the
+        # configspec was read.
+        for entry in self._validate_children(section, unvalidated, copy):
+            child = section[entry]
+            memo = None
+            if reuse:
+                memo = child._validation_memo
+                if memo is not None and not memo.unchanged(child, options):
+                    memo = None
+            if memo is not None:
+                check = memo.result
+            else:
+                check = self._validate_section(validator, child,
+                                               preserve_errors, copy, reuse,
+                                               fail_fast, virtual, cache)
+            if fail_fast:
+                if check is not True:
+                    return check
+                continue
+            if reuse:
+                depends = depends or child._validation_memo.depends
+            ret_true, ret_false = _validate_combine(out, entry, check,
+                                                    ret_true, ret_false)
+        if fail_fast:
+            section.extra_values = unvalidated
+            return True
+        result = self._validate_result(section, unvalidated, out, ret_true,
+                                       ret_false, preserve_errors)
+        if reuse:
+            section._validation_memo = _SectionMemo(
+                section, options, depends, result, remembered)
+        return result
+
+    def _shared_defaults(self, validator, configspec):
+        """
+        The converted defaults of the checks in ``configspec``, shared by
+        every section validated against it with ``virtual_defaults``.
+        """
+        known = self._default_maps.get(id(configspec))
+        if (known is not None and known[0] is configspec and
+            known[1] is validator):
+            return known[2]
+        defaults = {}
+        for entry in configspec.scalars:
+            if entry in ('__many__', '___many___'):
+                continue
             try:
-                section.default_values[entry] = validator.get_default_value(configspec[entry])
+                defaults[entry] = validator.get_default_value(
+                    configspec[entry])
             except (KeyError, AttributeError, validator.baseErrorClass):
-                # No default, bad default or validator has no 'get_default_value'
-                # (e.g. SimpleVal)
                 pass
+        self._default_maps[id(configspec)] = (configspec, validator, defaults)
+        return defaults
 
-            try:
-                check = validator.check(spec,
-                                        val,
-                                        missing=missing
-                                        )
-            except validator.baseErrorClass as e:
-                if not preserve_errors or isinstance(e, self._vdtMissingValue):
-                    out[entry] = False
-                else:
-                    # preserve the error
-                    out[entry] = e
-                    ret_false = False
-                ret_true = False
-            else:
-                ret_false = False
-                out[entry] = True
-                if self.stringify or missing:
-                    # if we are doing type conversion
-                    # or the value is a supplied default
-                    if not self.stringify:
-                        if isinstance(check, (list, tuple)):
-                            # preserve lists
-                            check = [self._str(item) for item in check]
-                        elif missing and check is None:
-                            # convert the None from a default to a ''
-                            check = ''
-                        else:
-                            check = self._str(check)
-                    if (check != val) or missing:
-                        section[entry] = check
-                if not copy and missing and entry not in section.defaults:
-                    section.defaults.append(entry)
-            return ret_true, ret_false
-
-        #
-        out = {}
-        ret_true = True
-        ret_false = True
+    def _validate_entries(self, section, copy):
+        """
+        Prepare ``section`` for ``validate``.
+        
+        Returns the list of unvalidated (extra) scalars, the incorrect
+        scalars and sections, and a generator of
+        ``(entry, spec, value, missing, in_configspec)`` for every scalar
+        to check. Values are read as the generator is consumed.
+        """
+        configspec = section.configspec
+        if self._lent:
+            section._unshare()
+        self._set_configspec(section, copy)
+        if section._virtual_defaults is not None:
+            # validated with ``virtual_defaults`` last time
+            section.default_values = dict(section.default_values)
+            section._virtual_defaults = None
 
         unvalidated = [k for k in section.scalars if k not in configspec]
         incorrect_sections = [k for k in configspec.sections if k in section.scalars]
         incorrect_scalars = [k for k in configspec.scalars if k in section.sections]
 
-        for entry in configspec.scalars:
-            if entry in ('__many__', '___many___'):
-                # reserved names
-                continue
-            if (not entry in section.scalars) or (entry in section.defaults):
-                # missing entries
-                # or entries from defaults
-                missing = True
-                val = None
-                if copy and entry not in section.scalars:
-                    # copy comments
-                    section.comments[entry] = (
-                        configspec.comments.get(entry, []))
-                    section.inline_comments[entry] = (
-                        configspec.inline_comments.get(entry, ''))
-                #
-            else:
-                missing = False
-                val = section[entry]
+        def entries():
+            for entry in configspec.scalars:
+                if entry in ('__many__', '___many___'):
+                    # reserved names
+                    continue
+                if (not entry in section.scalars) or (entry in section.defaults):
+                    # missing entries
+                    # or entries from defaults
+                    missing = True
+                    val = None
+                    if copy and entry not in section.scalars:
+                        # copy comments
+                        section.comments[entry] = (
+                            configspec.comments.get(entry, []))
+                        section.inline_comments[entry] = (
+                            configspec.inline_comments.get(entry, ''))
+                    #
+                else:
+                    missing = False
+                    val = section[entry]
+                yield entry, configspec[entry], val, missing, True
 
-            ret_true, ret_false = validate_entry(entry, configspec[entry], val,
-                                                 missing, ret_true, ret_false)
+            many = None
+            if '__many__' in configspec.scalars:
+                many = configspec['__many__']
+            elif '___many___' in configspec.scalars:
+                many = configspec['___many___']
 
-        many = None
-        if '__many__' in configspec.scalars:
-            many = configspec['__many__']
-        elif '___many___' in configspec.scalars:
-            many = configspec['___many___']
+            if many is not None:
+                for entry in unvalidated:
+                    yield entry, many, section[entry], False, False
+                del unvalidated[:]
 
-        if many is not None:
-            for entry in unvalidated:
-                val = section[entry]
-                ret_true, ret_false = validate_entry(entry, many, val, False,
-                                                     ret_true, ret_false)
-            unvalidated = []
+        return unvalidated, (incorrect_scalars, incorrect_sections), entries()
 
+    def _validate_store(self, section, entry, val, missing, outcome,
+                        preserve_errors, copy, virtual=False):
+        """
+        Record the ``outcome`` of ``_validate_scalar`` for ``entry`` in
+        ``section``, and return its result for the results dictionary.
+        """
+        has_default, default, ok, check = outcome
+        if not virtual:
+            section.default_values.pop(entry, None)
+            if has_default:
+                section.default_values[entry] = default
+
+        if not ok:
+            if not preserve_errors or isinstance(check, self._vdtMissingValue):
+                return False
+            # preserve the error
+            return check
+
+        if (virtual and missing and entry in section.default_values and
+            not dict.__contains__(section, entry)):
+            # read from the shared defaults instead
+            return True
+        if self.stringify or missing:
+            # if we are doing type conversion
+            # or the value is a supplied default
+            if not self.stringify:
+                if isinstance(check, (list, tuple)):
+                    # preserve lists
+                    check = [self._str(item) for item in check]
+                elif missing and check is None:
+                    # convert the None from a default to a ''
+                    check = ''
+                else:
+                    check = self._str(check)
+            if (check != val) or missing:
+                span = section._spans.get(entry)
+                raw = dict.get(section, entry)
+                section[entry] = check
+                if (span is not None and not missing and
+                    self._same_text(check, raw)):
+                    # only converted, so still written as it was read
+                    section._spans[entry] = span
+        if not copy and missing and entry not in section.defaults:
+            section.defaults.append(entry)
+        return True
+
+    def _validate_incorrect(self, validator, incorrect, out, ret_true,
+                            ret_false, preserve_errors):
+        """
+        Fail the members that are a scalar in ``section`` and a section in
+        its configspec, or the other way round.
+        """
+        incorrect_scalars, incorrect_sections = incorrect
         for entry in incorrect_scalars:
             ret_true = False
             if not preserve_errors:
@@ -2221,9 +4517,12 @@ class ConfigObj(Section):
                 ret_false = False
                 msg = 'Section %r was provided as a single value' % entry
                 out[entry] = validator.baseErrorClass(msg)
+        return ret_true, ret_false
 
-        # Missing sections will have been created as empty ones when the
-        # configspec was read.
+    def _validate_children(self, section, unvalidated, copy):
+        """Return the names of the subsections of ``section`` to validate."""
+        configspec = section.configspec
+        children = []
         for entry in section.sections:
             # FIXME: this means DEFAULT is not copied in copy mode
             if section is self and entry == 'DEFAULT':
@@ -2234,15 +4533,12 @@ class ConfigObj(Section):
             if copy:
                 section.comments[entry] = configspec.comments.get(entry, [])
                 section.inline_comments[entry] = configspec.inline_comments.get(entry, '')
-            check = self.validate(validator, preserve_errors=preserve_errors, copy=copy, section=section[entry])
-            out[entry] = check
-            if check == False:
-                ret_true = False
-            elif check == True:
-                ret_false = False
-            else:
-                ret_true = False
+            children.append(entry)
+        return children
 
+    def _validate_result(self, section, unvalidated, out, ret_true,
+                         ret_false, preserve_errors):
+        """Work out what ``validate`` returns for ``section``."""
         section.extra_values = unvalidated
         if preserve_errors and not section._created:
             # If the section wasn't created (i.e. it wasn't missing)
@@ -2261,11 +4557,83 @@ class ConfigObj(Section):
             return False
         return out
 
+    def _validate_executor(self, validator, preserve_errors, copy, section,
+                           executor):
+        """The ``validate`` implementation used when an executor is given."""
+        # Prepare every section first, parents before their subsections,
+        # gathering the checks to run. Then run them in the pool, in
+        # batches, and store the outcomes in the same order as ``validate``.
+        jobs = []
+        stack = [section]
+        while stack:
+            current = stack.pop()
+            unvalidated, incorrect, entries = self._validate_entries(current,
+                                                                     copy)
+            entries = list(entries)
+            children = self._validate_children(current, unvalidated, copy)
+            jobs.append((current, unvalidated, incorrect, entries, children))
+            stack.extend(current[entry] for entry in reversed(children))
+
+        pending = []
+        batch = []
+        size = 0
+        for job in jobs:
+            batch.append(job)
+            size += len(job[3])
+            if size >= WALK_BATCH_SIZE:
+                pending.append(self._submit_validate_batch(executor,
+                                                           validator, batch))
+                batch = []
+                size = 0
+        if batch:
+            pending.append(self._submit_validate_batch(executor, validator,
+                                                       batch))
+
+        states = {}
+        for batch, future in pending:
+            for job, outcomes in zip(batch, future.result()):
+                current, unvalidated, incorrect, entries, children = job
+                out = {}
+                ret_true = True
+                ret_false = True
+                for (entry, spec, val, missing, in_configspec), outcome in zip(
+                        entries, outcomes):
+                    out[entry] = check = self._validate_store(
+                        current, entry, val, missing, outcome,
+                        preserve_errors, copy)
+                    ret_true, ret_false = _validate_flags(check, ret_true,
+                                                          ret_false)
+                states[id(current)] = self._validate_incorrect(
+                    validator, incorrect, out, ret_true, ret_false,
+                    preserve_errors) + (out,)
+
+        # subsections come after their parent in ``jobs``
+        results = {}
+        for current, unvalidated, incorrect, entries, children in reversed(
+                jobs):
+            ret_true, ret_false, out = states[id(current)]
+            for entry in children:
+                ret_true, ret_false = _validate_combine(
+                    out, entry, results.pop(id(current[entry])), ret_true,
+                    ret_false)
+            result = self._validate_result(current, unvalidated, out,
+                                           ret_true, ret_false,
+                                           preserve_errors)
+            results[id(current)] = result
+        return results[id(section)]
+
+    def _submit_validate_batch(self, executor, validator, batch):
+        tasks = [[(spec, val, missing, in_configspec)
+                  for (entry, spec, val, missing, in_configspec) in job[3]]
+                 for job in batch]
+        return batch, executor.submit(_validate_batch, validator, tasks)
+
     
     def reset(self):
         """Clear ConfigObj instance and restore to 'freshly created' state."""
         self.clear()
         self._initialise()
+        self._default_maps = {}
         # FIXME: Should be done by '_initialise', but ConfigObj constructor (and reload)
         #        requires an empty dictionary
         self.configspec = None
@@ -2292,9 +4660,54 @@ class ConfigObj(Section):
         configspec = self._original_configspec
         current_options['configspec'] = configspec
 
-        self.clear()
-        self._initialise(current_options)
-        self._load(filename, configspec)
+        # what ``revalidate`` remembers is kept for the sections read again
+        memos = self._reloaded_memos()
+        saver = self._autosave
+        if saver is not None:
+            # not saved while it is half loaded
+            saver.lock.acquire()
+        try:
+            self.clear()
+            self._initialise(current_options)
+            self._load(filename, configspec)
+            for path, memo in memos.items():
+                section = self
+                for name in path:
+                    section = dict.get(section, name)
+                    if not isinstance(section, Section):
+                        break
+                else:
+                    section._validation_memo = memo
+            if saver is not None:
+                # the file holds what was just read, so there is nothing to
+                # save
+                self._saved_generation = self.generation
+                with saver.condition:
+                    saver.last_change = None
+        finally:
+            if saver is not None:
+                saver.lock.release()
+
+    def _reloaded_memos(self):
+        """
+        What ``revalidate`` remembers about each section, by path, for
+        ``reload``. The sections read again are new, so they can't be skipped
+        as unchanged, but the values in them are compared with the ones that
+        were checked.
+        """
+        memos = {}
+        stack = [((), self)]
+        while stack:
+            path, section = stack.pop()
+            memo = section._validation_memo
+            if memo is not None:
+                memos[path] = memo.reread()
+            for entry in section.sections:
+                child = dict.__getitem__(section, entry)
+                if isinstance(child, Section):
+                    stack.append((path + (entry,), child))
+        return memos
+
 
 class SimpleVal(object):
     """
@@ -56,6 +56,13 @@ def transform(section, key):
     else:
         val = val.replace('XXXX', 'CLIENT1')
         section[newkey] = val
+
+class TaggedConfig(ConfigObj):
+    """A subclass with an attribute of its own, for pickling."""
+
+    def __init__(self, *args, **kwargs):
+        ConfigObj.__init__(self, *args, **kwargs)
+        self.tag = None
         
 # Unittests
 
@@ -1302,7 +1309,88 @@ key = "value"
         string = pickle.dumps(ini)
         new = pickle.loads(string)
         self.assertTrue(new.validate(v))
-        
+
+    def test_dumps_loads(self):
+        import pickle
+        spec = ['', '[cow]', 'dog = boolean', 'n = integer(default=3)',
+                '[__many__]', 'x = string(default=q)']
+        c = ConfigObj(['', '# top', 'a = 1 # inline', '[cow]', 'dog = true',
+                       'l = a, b', '[other]', '[[deep]]', 'z = %(a)s'],
+                      configspec=spec, path_index=True)
+        self.assertTrue(c.validate(Validator()))
+        data = c.dumps()
+        new = ConfigObj.loads(data)
+        self.assertEquals(new, c)
+        self.assertEquals(new['other']['deep']['z'], '1')
+        self.assertEquals(new.comments, c.comments)
+        self.assertEquals(new.inline_comments, c.inline_comments)
+        self.assertEquals(new['cow'].defaults, ['n'])
+        self.assertEquals(new['cow'].default_values, {'n': 3})
+        self.assertTrue(new['other']['deep'].parent is new['other'])
+        self.assertTrue(new['other']['deep'].main is new)
+        self.assertTrue(new['other'].configspec is
+                        new.configspec['__many__'])
+        self.assertEquals(new._original_configspec, spec)
+        self.assertEquals(new.get_path(('other', 'deep', 'z')), '1')
+        self.assertEquals(new.BOM, c.BOM)
+        self.assertTrue(new.validate(Validator()))
+        # pickle uses dumps
+        self.assertTrue(len(pickle.dumps(c)) < len(data) + 100)
+        self.assertEquals(pickle.loads(pickle.dumps(c)), c)
+        self.assertRaises(ValueError, ConfigObj.loads, b'junk')
+        # values marshal can't handle fall back to pickling every attribute
+        c['obj'] = object
+        self.assertRaises(ValueError, c.dumps)
+        self.assertTrue(pickle.loads(pickle.dumps(c))['obj'] is object)
+        # and so do attributes ConfigObj doesn't set itself
+        t = TaggedConfig(['', '[s]', 'a = 1'])
+        self.assertEquals(pickle.loads(pickle.dumps(t)).tag, None)
+        t.tag = 'prod'
+        t['s'].note = 'x'
+        new = pickle.loads(pickle.dumps(t))
+        self.assertEquals((new.tag, new['s'].note), ('prod', 'x'))
+        self.assertEquals(new, t)
+
+    def test_shared_memory(self):
+        spec = ['', '[cow]', 'dog = boolean', 'n = integer(default=3)']
+        c = ConfigObj(['', 'a = 1', '[cow]', 'dog = true', 'l = a, %(x)s',
+                       'x = caf\xe9', '[[deep]]', 'z = %(a)s'],
+                      configspec=spec)
+        self.assertTrue(c.validate(Validator()))
+        block = c.to_shared_memory()
+        try:
+            shared = SharedConfig(block.name)
+            self.assertEquals(shared.dict(), c.dict())
+            self.assertEquals(list(shared), ['a', 'cow'])
+            self.assertEquals(shared['cow'].scalars, ['dog', 'l', 'x', 'n'])
+            self.assertEquals(shared['cow'].sections, ['deep'])
+            self.assertEquals(shared['cow']['l'], ['a', 'caf\xe9'])
+            self.assertEquals(shared['cow']['deep']['z'], '1')
+            self.assertTrue(shared['cow']['n'] == 3)
+            self.assertTrue(shared['cow'] is shared['cow'])
+            self.assertFalse('b' in shared)
+            self.assertRaises(KeyError, lambda: shared['b'])
+            def assign():
+                shared['a'] = '2'
+            self.assertRaises(TypeError, assign)
+            shared.close()
+            # a reader in another process leaves the block in place
+            import subprocess
+            script = ('from configobj import SharedConfig\n'
+                      'shared = SharedConfig(%r)\n'
+                      'print(shared["a"])\n'
+                      'shared.close()\n' % block.name)
+            output = subprocess.check_output([sys.executable, '-c', script],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.STDOUT)
+            self.assertEquals(output.decode('ascii').split(), ['1'])
+            shared = SharedConfig(block.name)
+            self.assertEquals(shared['a'], '1')
+            shared.close()
+        finally:
+            block.close()
+            block.unlink()
+
     def test_as_list(self):
         a = ConfigObj()
         a['a'] = 1
@@ -1312,6 +1400,810 @@ key = "value"
         a['a'] = [1]
         self.assertEquals(a.as_list('a'), [1])
         
+    def test_typed_accessor_cache(self):
+        c = ConfigObj()
+        c['a'] = '3'
+        c['b'] = 'off'
+        c['c'] = '%(a)s'
+        self.assertEquals(c.as_types({'a': int, 'b': bool, 'c': float}),
+                          {'a': 3, 'b': False, 'c': 3.0})
+        self.assertEquals(c.as_int('a'), 3)
+        c['a'] = '5'
+        self.assertEquals(c.as_int('a'), 5)
+        self.assertEquals(c.as_int('c'), 5)
+        c.rename('b', 'd')
+        self.assertRaises(KeyError, c.as_bool, 'b')
+        self.assertEquals(c.as_bool('d'), False)
+        del c['d']
+        self.assertRaises(KeyError, c.as_bool, 'd')
+        c['e'] = 'x'
+        first = c.as_list('e')
+        first.append('y')
+        self.assertEquals(c.as_list('e'), ['x'])
+        self.assertRaises(TypeError, c.as_types, {'a': dict})
+        
+    def test_freeze(self):
+        c = ConfigObj({'a': '1', 'l': ['x', 'y'],
+                       's': {'b': '%(a)s'}, 'u': {'q': '1'}})
+        frozen = c.freeze()
+        self.assertTrue(isinstance(frozen, FrozenConfig))
+        self.assertEquals(frozen['l'], ('x', 'y'))
+        self.assertEquals(frozen['s']['b'], '1')
+        self.assertEquals(frozen.sections, ('s', 'u'))
+        self.assertEquals(hash(frozen), hash(c.freeze()))
+        def assign():
+            frozen['a'] = '2'
+        self.assertRaises(TypeError, assign)
+        self.assertRaises(AttributeError, setattr, frozen, 'name', 'x')
+        
+        c['u']['q'] = '2'
+        again = c.freeze(frozen)
+        self.assertTrue(again['s'] is frozen['s'])
+        self.assertFalse(again['u'] is frozen['u'])
+        self.assertEquals(again['u']['q'], '2')
+        self.assertTrue(c.freeze(again) is again)
+        self.assertEquals(again.dict(), c.dict())
+        
+    def test_clone(self):
+        c = ConfigObj({'a': '1', 'l': ['x'],
+                       'svc': {'db': {'host': 'h'}, 'web': {'x': '1'}},
+                       'other': {'k': 'v'}})
+        c.initial_comment = ['# comment']
+        clone = c.clone()
+        clone['svc']['db']['host'] = 'h2'
+        clone['l'].append('y')
+        self.assertEquals(c['svc']['db']['host'], 'h')
+        self.assertEquals(c['l'], ['x'])
+        self.assertTrue(dict.__getitem__(clone, 'other') is
+                        dict.__getitem__(c, 'other'))
+        self.assertTrue(dict.__getitem__(clone['svc'], 'web') is
+                        dict.__getitem__(c['svc'], 'web'))
+        self.assertTrue(clone['svc']['db'].parent is clone['svc'])
+        self.assertTrue(clone['other'].main is clone)
+        self.assertEquals(clone.initial_comment, ['# comment'])
+        self.assertEquals(clone['svc']['db']['host'], 'h2')
+        self.assertEquals(clone['other'], c['other'])
+
+    def test_clone_original_changed(self):
+        c = ConfigObj({'svc': {'db': {'host': 'h', 'l': ['x']}},
+                       'other': {'k': 'v'}}, path_index=True)
+        clone = c.clone()
+        self.assertEquals(len(list(clone.iter_paths())), 6)
+        # listing the paths of the clone copies nothing
+        self.assertTrue(dict.__getitem__(clone, 'svc') is
+                        dict.__getitem__(c, 'svc'))
+        self.assertEquals(clone.get_path(('svc', 'db', 'host')), 'h')
+        c['svc']['db']['host'] = 'h2'
+        c['svc']['db']['l'].append('y')
+        del c['other']['k']
+        self.assertEquals(c['svc']['db']['host'], 'h2')
+        self.assertEquals(clone['svc']['db']['host'], 'h')
+        self.assertEquals(clone.get_path(('svc', 'db', 'host')), 'h')
+        self.assertEquals(clone['svc']['db']['l'], ['x'])
+        self.assertEquals(clone['other'], {'k': 'v'})
+        self.assertTrue(clone['svc']['db'].main is clone)
+        
+    def test_iter_walk(self):
+        c = ConfigObj({'a': '1', 's': {'b': '2', 't': {'c': '3'}}, 'u': {}})
+        self.assertEquals(
+            [(path, key) for (path, section, key) in c.iter_walk()],
+            [((), 'a'), (('s',), 'b'), (('s', 't'), 'c')])
+        self.assertEquals(
+            [key for (path, section, key) in
+                c.iter_walk(call_on_sections=True)],
+            ['a', 's', 'b', 't', 'c', 'u'])
+        
+        deep = section = ConfigObj()
+        for i in range(sys.getrecursionlimit() + 10):
+            section['s'] = {}
+            section = section['s']
+        section['key'] = 'value'
+        path, section, key = list(deep.iter_walk())[-1]
+        self.assertEquals(section[key], 'value')
+        
+    def test_walk_with_executor(self):
+        from concurrent.futures import ThreadPoolExecutor
+        c = ConfigObj({'a': 'x', 's': {'b': 'y', 't': {'c': 'z'}}, 'u': {}})
+        def upper(value, suffix):
+            if value == 'y':
+                raise ValueError
+            return value.upper() + suffix
+        executor = ThreadPoolExecutor(2)
+        try:
+            self.assertEquals(
+                c.walk(upper, raise_errors=False, executor=executor,
+                       suffix='!'),
+                {'a': 'X!', 's': {'b': False, 't': {'c': 'Z!'}}, 'u': {}})
+            self.assertRaises(ValueError, c.walk, upper, executor=executor,
+                              suffix='')
+        finally:
+            executor.shutdown()
+        self.assertEquals(c['a'], 'X!')
+        self.assertEquals(c['s']['b'], 'y')
+        self.assertEquals(c['s']['t']['c'], 'Z!')
+
+    def test_path_index(self):
+        infile = ['', 'a = 1', '[svc]', 'x = %(a)s', '[[db]]', 'host = h']
+        for path_index in (False, True):
+            c = ConfigObj(infile, path_index=path_index)
+            self.assertEquals(c.get_path(('svc', 'x')), '1')
+            self.assertEquals(c.get_path(['svc', 'db', 'host']), 'h')
+            self.assertTrue(c.get_path(('svc', 'db')) is c['svc']['db'])
+            self.assertRaises(KeyError, c.get_path, ('svc', 'nope'))
+            self.assertRaises(KeyError, c.get_path, ('a', 'b'))
+            c.rename('svc', 'service')
+            c['service']['db']['port'] = '5'
+            c['new'] = {'q': {'r': '2'}}
+            del c['service']['x']
+            self.assertEquals(list(c.iter_paths()),
+                [('a',), ('service',), ('service', 'db'),
+                 ('service', 'db', 'host'), ('service', 'db', 'port'),
+                 ('new',), ('new', 'q'), ('new', 'q', 'r')])
+            self.assertEquals(list(c.iter_paths(('new',))),
+                              [('new', 'q'), ('new', 'q', 'r')])
+            self.assertEquals(c.get_path(('service', 'db', 'port')), '5')
+            self.assertRaises(KeyError, c.get_path, ('svc', 'db', 'host'))
+            self.assertRaises(KeyError, c.get_path, ('service', 'x'))
+            c['new'].clear()
+            self.assertRaises(KeyError, c.get_path, ('new', 'q', 'r'))
+            self.assertEquals(c.clone().get_path(('service', 'db', 'host')),
+                              'h')
+        self.assertEquals(sorted(c._path_index),
+            [('a',), ('new',), ('service',), ('service', 'db'),
+             ('service', 'db', 'host'), ('service', 'db', 'port')])
+
+    def test_generation_and_subscribe(self):
+        c = ConfigObj({'a': '1', 'svc': {'x': '2', 'db': {'host': 'h'}}})
+        db = c['svc']['db']
+        before = (c.generation, c['svc'].generation, db.generation)
+        c['a']
+        c.as_int('a')
+        self.assertEquals((c.generation, c['svc'].generation, db.generation),
+                          before)
+        db['host'] = 'k'
+        self.assertEquals(db.generation, before[2] + 1)
+        self.assertEquals(c['svc'].generation, before[1] + 1)
+        self.assertEquals(c.generation, before[0] + 1)
+        changes = []
+        def changed(path):
+            changes.append(path)
+        c.subscribe(('svc', 'db', 'host'), changed)
+        c.subscribe(['svc'], changed)
+        db['host'] = 'j'
+        c['a'] = '3'
+        c['svc'].rename('x', 'y')
+        generation = c.generation
+        c.merge({'svc': {'y': '4'}})
+        self.assertTrue(c.generation > generation)
+        del c['svc']
+        self.assertEquals(changes, [
+            ('svc', 'db', 'host'), ('svc', 'db', 'host'),
+            ('svc', 'x'), ('svc', 'y'), ('svc', 'y'), ('svc',), ('svc',)])
+        c.unsubscribe(('svc',), changed)
+        self.assertRaises(ValueError, c.unsubscribe, ('svc',), changed)
+        del changes[:]
+        c.clear()
+        self.assertEquals(changes, [()])
+        self.assertEquals(c.clone()._subscribers, {})
+
+    def test_iter_write(self):
+        c = ConfigObj({'a': 'x'})
+        for i in range(3000):
+            c['section%d' % i] = {'key': '%(a)s and some padding'}
+        c.newlines = '\n'
+        c.final_comment = ['# end']
+        chunks = c.iter_write()
+        first = next(chunks)
+        # interpolation is left on while writing
+        self.assertEquals(c['section0']['key'], 'x and some padding')
+        output = first + ''.join(chunks)
+        self.assertTrue(len(first) < len(output))
+        self.assertEquals(output, '\n'.join(c.write()) + '\n')
+        outfile = StringIO()
+        c.write(outfile)
+        self.assertEquals(outfile.getvalue(), output)
+        self.assertEquals(''.join(c.iter_write('\r\n')),
+                          output.replace('\n', '\r\n'))
+        c.encoding = 'utf_16'
+        data = b''.join(c.iter_write())
+        self.assertEquals(data, output.encode('utf_16'))
+        self.assertEquals(''.join(ConfigObj().iter_write('\n')), '\n')
+
+    def test_keep_comments(self):
+        from io import BytesIO
+        import pickle
+        source = (b'# top\n\na = 1 # x\n# c\n[s] # y\n    b = 2\n'
+                  b'    [[t]]\n        c = 3\n# end\n')
+        c = ConfigObj(BytesIO(source), keep_comments=False)
+        self.assertEquals(c, {'a': '1', 's': {'b': '2', 't': {'c': '3'}}})
+        self.assertEquals((c.initial_comment, c.final_comment), ([], []))
+        self.assertEquals(c.comments, {})
+        self.assertTrue(c['s']['t'].inline_comments is c.inline_comments)
+        self.assertEquals(c['s'].comments['t'], [])
+        self.assertEquals(c['s'].inline_comments['t'], '')
+        c['s'].comments['b'] = ['# ignored']
+        c['s'].rename('b', 'd')
+        del c['a']
+        c['n'] = {'x': '1'}
+        self.assertEquals(c['s'].comments, {})
+        self.assertEquals(c.write(), ['[s]', '    d = 2', '    [[t]]',
+                                      '        c = 3', '[n]', '    x = 1'])
+        self.assertEquals(c.clone().write(), c.write())
+        self.assertEquals(pickle.loads(pickle.dumps(c)).write(), c.write())
+        c.clear()
+        self.assertEquals(c.comments, {})
+
+    def test_quote_cache(self):
+        import configobj
+        c = ConfigObj()
+        values = ['plain', ' lead', 'a,b', "it's", 'a#b', 'two\nlines',
+                  '\'"#', 'caf\xe9']
+        expected = ['plain', '" lead"', '"a,b"', "it's", '"a#b"',
+                    "'''two\nlines'''", "''''\"#'''", 'caf\xe9']
+        for i in range(2):
+            self.assertEquals([c._quote(value) for value in values], expected)
+        self.assertEquals(c._quote('a,b', multiline=False), '"a,b"')
+        self.assertRaises(ConfigObjError, c._quote, 'two\nlines', False)
+        c.list_values = False
+        self.assertEquals(c._quote('a,b'), 'a,b')
+        self.assertEquals(c._quote('a#b'), 'a#b')
+        size = configobj.QUOTE_CACHE_SIZE
+        for i in range(size + 10):
+            c._quote('value %d,' % i)
+        self.assertTrue(len(configobj._quote_cache) <= size)
+
+    def test_autosave(self):
+        import shutil
+        import subprocess
+        import tempfile
+        import time
+        import warnings
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'auto.ini')
+            h = open(filename, 'w')
+            h.write('a = 1\n')
+            h.close()
+            c = ConfigObj(filename)
+            writes = []
+            write_bytes = c._write_bytes
+            def counting(h, newline=None):
+                writes.append(newline)
+                write_bytes(h, newline)
+            c._write_bytes = counting
+            self.assertRaises(ValueError, ConfigObj().autosave)
+            c.autosave(0.05)
+            for i in range(100):
+                c['key%d' % i] = str(i)
+            end = time.time() + 5
+            while not writes and time.time() < end:
+                time.sleep(0.01)
+            time.sleep(0.2)
+            # the burst of changes was saved with a single write
+            self.assertEquals(len(writes), 1)
+            self.assertEquals(ConfigObj(filename), c)
+            c['b'] = '2'
+            c.flush()
+            self.assertEquals(ConfigObj(filename)['b'], '2')
+            c.flush()
+            self.assertEquals(len(writes), 2)
+            c['c'] = '3'
+            c.autosave(None)
+            self.assertEquals(ConfigObj(filename)['c'], '3')
+            self.assertEquals(os.listdir(directory), ['auto.ini'])
+            # a failed save is tried again after the next change
+            def failing(h, newline=None):
+                c._write_bytes = write_bytes
+                raise IOError('disk full')
+            c._write_bytes = failing
+            c.autosave(0.05)
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                c['d'] = '4'
+                end = time.time() + 5
+                while not caught and time.time() < end:
+                    time.sleep(0.01)
+            self.assertTrue('disk full' in str(caught[0].message))
+            c['e'] = '5'
+            end = time.time() + 5
+            while 'e' not in ConfigObj(filename) and time.time() < end:
+                time.sleep(0.01)
+            self.assertEquals(ConfigObj(filename)['d'], '4')
+            # reloading doesn't write back the file just read
+            h = open(filename, 'w')
+            h.write('# keep me\na   =   1\n')
+            h.close()
+            c.reload()
+            time.sleep(0.2)
+            h = open(filename)
+            self.assertEquals(h.read(), '# keep me\na   =   1\n')
+            h.close()
+            c.autosave(None)
+            self.assertEquals(ConfigObj(filename).initial_comment,
+                              ['# keep me'])
+            # what is left unsaved is saved when the program exits
+            script = ('from configobj import ConfigObj\n'
+                      'c = ConfigObj(%r)\n'
+                      'c.autosave(60)\n'
+                      'c["f"] = "6"\n' % filename)
+            subprocess.check_call([sys.executable, '-c', script],
+                cwd=os.path.dirname(os.path.abspath(__file__)))
+            self.assertEquals(ConfigObj(filename)['f'], '6')
+        finally:
+            shutil.rmtree(directory)
+
+    def test_incremental_write(self):
+        from io import BytesIO
+        source = ("# top\n\nkey   =  v   # c\n[sec]  # sc\n  k2 = '''a\nb'''\n"
+                  "  n = 3\n    [[sub]]\n        z = %(k2)s ,  x\n")
+        spec = ['', '[sec]', 'n = integer']
+        c = ConfigObj(BytesIO(source.encode('ascii')), configspec=spec,
+                      incremental_write=True)
+        c.newlines = '\n'
+        self.assertTrue(c.validate(Validator()))
+        self.assertEquals(c['sec']['n'], 3)
+        # unchanged (or only converted) entries are written as they were read
+        self.assertEquals(''.join(c.iter_write()), source)
+        # values a check changed are written again
+        lower = Validator({'lower': lambda value: value.lower()})
+        d = ConfigObj(BytesIO(b'a =  X\nb = yes\n'), configspec=['',
+                      'a = lower', 'b = boolean'], incremental_write=True)
+        d.validate(lower)
+        self.assertEquals(d.write(), ['a = x', 'b = True'])
+        # so are lists changed in place
+        e = ConfigObj(BytesIO(b'l = a,  b\nm = c,\n'), incremental_write=True)
+        e['l'].append('c')
+        self.assertEquals(e.write(), ['l = a, b, c', 'm = c,'])
+        e['l'][:] = ['a', 'b']
+        self.assertEquals(e.write(), ['l = a,  b', 'm = c,'])
+        c['sec']['sub']['z'] = 'new'
+        c.inline_comments['key'] = '# changed'
+        del c['sec']['n']
+        self.assertEquals(c.write(), ['# top', '', 'key = v  # changed',
+            '[sec]  # sc', "  k2 = '''a", "b'''", '    [[sub]]',
+            '    z = new'])
+        # writing with different settings writes everything again
+        c.indent_type = ''
+        self.assertEquals(c.write(), ['# top', '', 'key = v# changed',
+            '[sec]# sc', "k2 = '''a\nb'''", '[[sub]]', 'z = new'])
+
+    def test_compiled_checks(self):
+        spec = ['', 'a = integer(0, 9)', 'b = int_list(max=2, default=list(1, 2))',
+                '[s]', 'c = integer(0, 9)', 'd = float(default=1.5)']
+        v = Validator()
+        self.assertEquals(v.compile(ConfigObj(spec, _inspec=True)), 3)
+        c = ConfigObj(['', 'a = 3', '[s]', 'c = -1'], configspec=spec)
+        result = c.validate(v, preserve_errors=True)
+        self.assertTrue(isinstance(result['s']['c'], VdtValueTooSmallError))
+        self.assertEquals(c['a'], 3)
+        self.assertEquals(c['b'], [1, 2])
+        self.assertEquals(c['s']['d'], 1.5)
+        # bad parameters still fail when the check is applied
+        self.assertRaises(SyntaxError, v.check, 'string(min="x")', 'hi')
+        # converted list defaults are handed out as copies
+        v.get_default_value('int_list(max=2, default=list(1, 2))').append(3)
+        self.assertEquals(v.get_default_value('int_list(max=2, default=list(1, 2))'),
+                          [1, 2])
+        # replacing a check function recompiles the checks using it
+        v.functions['integer'] = lambda value, *args: 'replaced'
+        self.assertEquals(v.check('integer(0, 9)', '3'), 'replaced')
+
+    def test_check_cache(self):
+        import pickle
+        import threading
+        from validate import CheckCache
+        v = Validator(cache_size=2)
+        for check in ('integer', 'float', 'integer', 'boolean', 'float'):
+            v.check(check, '1')
+        # least recently used 'integer' was dropped to make room
+        self.assertEquals(tuple(v.cache_info()), (1, 4, 2, 2))
+        self.assertFalse('integer' in v._cache)
+        v.cache_clear()
+        self.assertEquals(tuple(v.cache_info()), (0, 0, 2, 0))
+        cache = CheckCache(None)
+        results = []
+        def run():
+            vtor = Validator(cache=cache)
+            results.append([vtor.check('integer(max=%d)' % i, i)
+                            for i in range(200)])
+        threads = [threading.Thread(target=run) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(results, [list(range(200))] * 4)
+        info = cache.info()
+        self.assertEquals(info.currsize, 200)
+        self.assertEquals(info.hits + info.misses, 800)
+        v = pickle.loads(pickle.dumps(Validator(cache=cache)))
+        self.assertEquals(tuple(v.cache_info()), (0, 0, None, 0))
+        self.assertEquals(v.check('integer', '3'), 3)
+
+    def test_validate_with_executor(self):
+        import pickle
+        from concurrent.futures import ThreadPoolExecutor
+        from validate import VdtTypeError
+        spec = ['', 'a = integer(default=3)', 'b = integer', '[many]',
+                '[[__many__]]', 'n = integer(0, 10, default=1)',
+                '[[[sub]]]', 'q = option(a, b)', '[missing]',
+                'm = integer(default=4)']
+        lines = ['', 'a = x', 'extra = 1', '[many]']
+        for i in range(20):
+            lines.extend(['[[s%d]]' % i, 'n = %d' % i, 'e = 1'])
+            if i % 3 == 0:
+                lines.extend(['[[[sub]]]', 'q = %s' % 'ac'[i % 2]])
+        def validate(executor):
+            c = ConfigObj(lines, configspec=spec)
+            result = c.validate(Validator(), preserve_errors=True,
+                                executor=executor)
+            sections = []
+            def record(section):
+                sections.append((section.name, section.dict(),
+                                 section.default_values, section.defaults,
+                                 section.extra_values))
+            record(c)
+            for path, section, key in c.iter_walk(call_on_sections=True):
+                if key in section.sections:
+                    record(section[key])
+            return repr(result), sections
+        executor = ThreadPoolExecutor(4)
+        try:
+            self.assertEquals(validate(executor), validate(None))
+        finally:
+            executor.shutdown()
+        # errors survive being sent back from a process pool
+        error = pickle.loads(pickle.dumps(VdtTypeError('x')))
+        self.assertEquals(str(error), 'the value "x" is of the wrong type.')
+
+    def test_revalidate(self):
+        checked = []
+        class RecordingValidator(Validator):
+            def check(self, check, value, missing=False):
+                checked.append(value)
+                return Validator.check(self, check, value, missing=missing)
+        spec = ['', 'a = integer(default=3)', 'name = string', '[__many__]',
+                'n = integer(0, 10)', 'label = string']
+        config = ['', 'name = top', '[s1]', 'n = 1', 'label = one',
+                  '[s2]', 'n = 2', 'label = %(name)s']
+        c = ConfigObj(config, configspec=spec)
+        v = RecordingValidator()
+        # validate doesn't remember anything
+        self.assertEquals(c.validate(v), True)
+        self.assertEquals(c['s1']._validation_memo, None)
+        self.assertEquals(c.revalidate(v), True)
+        self.assertEquals(len(checked), 12)
+        del checked[:]
+        # nothing changed, nothing is checked
+        self.assertEquals(c.revalidate(v), True)
+        self.assertEquals(checked, [])
+        c['s1']['n'] = '20'
+        self.assertEquals(c.revalidate(v), {'a': True, 'name': True,
+            's1': {'n': False, 'label': True}, 's2': True})
+        self.assertEquals(checked, ['20'])
+        del checked[:]
+        # a change to an interpolated value is noticed
+        c['name'] = 'changed'
+        c['s1']['n'] = '5'
+        self.assertEquals(c.revalidate(v), True)
+        self.assertEquals(sorted(checked), ['5', 'changed', 'changed'])
+        self.assertEquals(c['s1']['n'], 5)
+        del checked[:]
+        del c['a']
+        self.assertEquals(c.revalidate(v), True)
+        self.assertEquals(checked, [None])
+        self.assertEquals(c['a'], 3)
+        self.assertEquals(c.defaults, ['a'])
+        # other options check everything again
+        del checked[:]
+        self.assertEquals(c.revalidate(v, preserve_errors=True), True)
+        self.assertEquals(len(checked), 6)
+        # a section put in place of another one is checked
+        del checked[:]
+        c['s2'] = {'n': '2', 'label': 'two'}
+        self.assertEquals(c.revalidate(v, preserve_errors=True), True)
+        self.assertEquals(sorted(checked), ['2', 'two'])
+        # after a reload only the values that changed in the file are checked
+        import tempfile
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            text = '\n'.join(config[1:])
+            with open(filename, 'w') as h:
+                h.write(text)
+            c = ConfigObj(filename, configspec=spec)
+            self.assertEquals(c.revalidate(v), True)
+            del checked[:]
+            c.reload()
+            self.assertEquals(c.revalidate(v), True)
+            self.assertEquals(checked, [])
+            self.assertEquals((c['s1']['n'], c['a']), (1, 3))
+            self.assertEquals(c.defaults, ['a'])
+            with open(filename, 'w') as h:
+                h.write(text.replace('n = 2', 'n = 7'))
+            c.reload()
+            self.assertEquals(c.revalidate(v), True)
+            self.assertEquals(checked, ['7'])
+            self.assertEquals(c['s2']['n'], 7)
+        finally:
+            os.remove(filename)
+
+    def test_numeric_lists(self):
+        from validate import VdtTypeError
+        v = Validator()
+        members = [str(i) for i in range(1000)]
+        self.assertEquals(v.check('int_list', members), list(range(1000)))
+        self.assertEquals(v.check('float_list', members + [2, 3.5]),
+                          [float(i) for i in range(1000)] + [2.0, 3.5])
+        self.assertEquals(v.check('bool_list', ['Yes', 'off', True]),
+                          [True, False, True])
+        # the first member that fails is reported
+        members[500] = '1.5'
+        members[700] = 'x'
+        for check in ('int_list', 'float_list', 'bool_list'):
+            try:
+                v.check(check, members)
+            except VdtTypeError as e:
+                error = str(e)
+            self.assertTrue(error.startswith('the value "%s"' %
+                            {'int_list': '1.5', 'float_list': 'x',
+                             'bool_list': '2'}[check]))
+        self.assertEquals(v.check('int_list', [True, '2']), [True, 2])
+
+    def test_as_array(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('NumPy is not installed')
+        c = ConfigObj()
+        c['a'] = ['1.5', '2', 3]
+        c['b'] = ['yes', 'off']
+        c['c'] = '4'
+        self.assertEquals(c.as_array('a').tolist(), [1.5, 2.0, 3.0])
+        self.assertEquals(c.as_array('b', bool).tolist(), [True, False])
+        self.assertEquals(c.as_array('c', int).tolist(), [4])
+        c['d'] = ['1', 'x']
+        self.assertRaises(ValueError, c.as_array, 'd', int)
+
+    def test_validate_fail_fast(self):
+        from validate import VdtTypeError
+        spec = ['', 'a = integer', '[s]', 'b = integer', 'c = integer',
+                '[t]', 'd = integer(default=1)']
+        c = ConfigObj(['', 'a = 1', '[s]', 'b = x', 'c = y'],
+                      configspec=spec)
+        self.assertEquals(c.validate(Validator(), fail_fast=True),
+                          (['s'], 'b', False))
+        self.assertEquals(c['a'], 1)
+        # validation stopped before the section 't' was reached
+        self.assertEquals(c['t'].default_values, {})
+        error = c.validate(Validator(), preserve_errors=True,
+                           fail_fast=True)[2]
+        self.assertTrue(isinstance(error, VdtTypeError))
+        c['s']['b'] = c['s']['c'] = '2'
+        self.assertEquals(c.validate(Validator(), fail_fast=True), True)
+        self.assertEquals(c['t']['d'], 1)
+        self.assertRaises(ValueError, c.validate, Validator(), fail_fast=True,
+                          executor=object())
+
+    def test_codegen(self):
+        import shutil
+        import tempfile
+        spec = ConfigObj(['', 'a = integer(0, 9)', 'b = boolean(default=no)',
+                          'c = option(x, y)', 'd = int_list(default=list(1))',
+                          '[s]', 'e = float(max=2)', '[t]', 'f = string'],
+                         _inspec=True)
+        vtor = Validator()
+        validate = vtor.codegen(spec)
+        for lines in (['', 'a = 3', 'c = x', '[s]', 'e = 1.5', '[t]', 'f = z'],
+                      ['', 'a = 10', 'c = w', 'g = 1', '[s]', 'e = x',
+                       '[u]']):
+            for preserve_errors in (False, True):
+                expected = ConfigObj(lines, configspec=spec)
+                result = expected.validate(vtor, preserve_errors)
+                c = ConfigObj(lines)
+                self.assertEquals(repr(validate(c, preserve_errors)),
+                                  repr(result))
+                self.assertEquals(c, expected)
+                self.assertEquals(c.defaults, expected.defaults)
+                self.assertEquals(c.default_values, expected.default_values)
+                self.assertEquals(c.extra_values, expected.extra_values)
+                self.assertTrue(c.configspec is spec)
+        # a scalar where the configspec has a section is left to validate
+        c = ConfigObj(['', 'a = 1', 'c = y', 's = 1'])
+        self.assertEquals(validate(c), {'a': True, 'b': True, 'c': True,
+                                        'd': True, 's': False, 't': False})
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'spec.py')
+            vtor.codegen(spec, cache_file=filename)
+            h = open(filename, 'a')
+            h.write('# kept\n')
+            h.close()
+            validate = vtor.codegen(spec, cache_file=filename)
+            self.assertTrue(open(filename).read().endswith('# kept\n'))
+            c = ConfigObj(['', 'a = 1', 'c = y', '[s]', 'e = 0', '[t]',
+                           'f = z'])
+            self.assertEquals(validate(c), True)
+            # a changed configspec is generated again
+            spec['s']['e'] = 'float(max=1)'
+            vtor.codegen(spec, cache_file=filename)
+            self.assertFalse(open(filename).read().endswith('# kept\n'))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_shared_configspec(self):
+        import shutil
+        import tempfile
+        from configobj import ConfigspecRegistry, configspec_registry
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'spec.ini')
+            h = open(filename, 'w')
+            h.write('a = integer(default=1)\n')
+            h.close()
+            c1 = ConfigObj(['', 'a = 2'], configspec=filename,
+                           shared_configspec=True)
+            c2 = ConfigObj(configspec=filename, shared_configspec=True)
+            self.assertTrue(c1.configspec is c2.configspec)
+            self.assertFalse(ConfigObj(configspec=filename).configspec is
+                             c1.configspec)
+            self.assertTrue(c1.validate(Validator()))
+            self.assertTrue(c2.validate(Validator()))
+            self.assertEquals((c1['a'], c2['a']), (2, 1))
+            # a changed file is read again
+            h = open(filename, 'w')
+            h.write('a = integer(default=3)\nb = boolean(default=no)\n')
+            h.close()
+            stat = os.stat(filename)
+            os.utime(filename, (stat.st_atime, stat.st_mtime + 10))
+            c3 = ConfigObj(configspec=filename, shared_configspec=True)
+            self.assertFalse(c3.configspec is c1.configspec)
+            self.assertEquals(c3.configspec['b'], 'boolean(default=no)')
+
+            registry = ConfigspecRegistry()
+            vtor = Validator(cache_size=None)
+            registry.compile(vtor)
+            spec = registry.get(filename)
+            self.assertTrue(registry.get(filename) is spec)
+            self.assertEquals(len(registry), 1)
+            self.assertEquals(vtor.cache_info().currsize, 2)
+            registry.clear()
+            self.assertFalse(registry.get(filename) is spec)
+            self.assertRaises(IOError, registry.get,
+                              os.path.join(directory, 'missing.ini'))
+        finally:
+            configspec_registry.clear()
+            shutil.rmtree(directory)
+
+    def test_virtual_defaults(self):
+        spec = ['', '[__many__]', 'a = integer(default=1)',
+                'b = int_list(default=list(1, 2))', 'c = integer']
+        c = ConfigObj(['', '[s1]', 'a = 5', 'c = 1', '[s2]', 'c = 2'],
+                      configspec=spec)
+        self.assertEquals(c.validate(Validator(), virtual_defaults=True),
+                          True)
+        s1, s2 = c['s1'], c['s2']
+        # nothing was stored for the missing values
+        self.assertEquals(s2.scalars, ['c'])
+        self.assertEquals(s2.defaults, [])
+        self.assertFalse('a' in s2)
+        self.assertTrue(s1.default_values is s2.default_values)
+        self.assertEquals(s2.default_values, {'a': 1, 'b': [1, 2]})
+        self.assertEquals((s1['a'], s2['a'], s2.get('b')), (5, 1, [1, 2]))
+        self.assertEquals(s2.as_int('a'), 1)
+        s2['b'].append(3)
+        self.assertEquals(s1['b'], [1, 2])
+        self.assertEquals(s2.restore_default('a'), 1)
+        self.assertEquals(s2.scalars, ['c'])
+        self.assertRaises(KeyError, lambda: s2['c2'])
+        # copies of the members leave them out
+        self.assertEquals(s2.dict(), {'c': 2})
+        self.assertEquals(dict(c.freeze()['s2']), {'c': 2})
+        # but they are found by path, with or without the index
+        self.assertEquals(c.get_path(('s2', 'a')), 1)
+        c.path_index = True
+        self.assertEquals(c.get_path(('s2', 'a')), 1)
+        self.assertEquals(c.get_path(('s1', 'a')), 5)
+        self.assertRaises(KeyError, c.get_path, ('s2', 'd'))
+        # a copy keeps them missing, reading the (shared) defaults
+        c2 = ConfigObj.loads(c.dumps())
+        self.assertEquals(c2['s2'], {'c': 2})
+        self.assertEquals(c2['s2'].defaults, [])
+        self.assertEquals((c2['s2']['a'], c2['s2']['b']), (1, [1, 2]))
+        self.assertTrue(c2['s1'].default_values is c2['s2'].default_values)
+        # validating without virtual defaults stores them again
+        self.assertEquals(c.validate(Validator()), True)
+        self.assertEquals(s2.defaults, ['a', 'b'])
+        self.assertFalse(s1.default_values is s2.default_values)
+        self.assertRaises(ValueError, c.validate, Validator(),
+                          virtual_defaults=True, executor=object())
+
+    def test_validation_cache(self):
+        import shutil
+        import tempfile
+        from configobj import ValidationCache
+        calls = []
+        def counted(value):
+            calls.append(value)
+            return int(value)
+        spec = ['', 'a = counted', '[s]', 'b = counted', 'c = integer(0, 5)']
+        lines = ['', 'a = 1', '[s]', 'b = 2', 'c = 9']
+        directory = tempfile.mkdtemp()
+        try:
+            cache = ValidationCache(directory)
+            vtor = Validator({'counted': counted})
+            c = ConfigObj(lines, configspec=spec)
+            expected = c.validate(vtor, preserve_errors=True, cache=cache)
+            self.assertEquals((len(calls), cache.hits, cache.misses),
+                              (2, 0, 2))
+            # unchanged sections are not checked again
+            c = ConfigObj(lines, configspec=spec)
+            result = c.validate(vtor, preserve_errors=True, cache=cache)
+            self.assertEquals(repr(result), repr(expected))
+            self.assertEquals((c['a'], c['s']['b']), (1, 2))
+            self.assertEquals((len(calls), cache.hits), (2, 2))
+            # only the changed section is
+            c = ConfigObj(lines[:3] + ['b = 3'] + lines[4:], configspec=spec)
+            c.validate(vtor, cache=cache)
+            self.assertEquals(calls, ['1', '2', '3'])
+            # another cache finds the outcomes in the directory
+            cache = ValidationCache(directory)
+            c = ConfigObj(lines, configspec=spec)
+            c.validate(vtor, cache=cache)
+            self.assertEquals((len(calls), cache.hits, len(cache)), (3, 2, 2))
+            self.assertRaises(ValueError, c.validate, vtor, cache=cache,
+                              executor=object())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_validator_profiling(self):
+        vtor = Validator({'double': lambda value: int(value) * 2})
+        self.assertRaises(ValueError, vtor.profile_report)
+        vtor.enable_profiling(slowest=2)
+        c = ConfigObj(['', 'a = 1', '[s]', 'b = 2', 'c = x'],
+                      configspec=['', 'a = double', '[s]', 'b = double',
+                                  'c = integer'])
+        c.validate(vtor)
+        report = vtor.profile_report()
+        self.assertEquals(sorted(report.checks), ['double', 'integer'])
+        self.assertEquals(report.checks['double'][:2], (2, 0))
+        self.assertEquals(report.checks['integer'][:2], (1, 1))
+        self.assertEquals(len(report.slowest), 2)
+        self.assertTrue(set([where for (seconds, check, where) in
+                             report.slowest]) <=
+                        set([((), 'a'), (('s',), 'b'), (('s',), 'c')]))
+        self.assertEquals((report.cache_hits, report.cache_misses), (4, 2))
+        self.assertTrue('double' in str(report))
+        vtor.disable_profiling()
+        self.assertEquals(vtor.profiler, None)
+
+    def test_lazy_error_messages(self):
+        import pickle
+        import validate
+        error = validate.VdtTypeError('x')
+        self.assertEquals(error.value, 'x')
+        self.assertEquals(error.args, ('the value "x" is of the wrong type.',))
+        self.assertEquals(str(error), 'the value "x" is of the wrong type.')
+        self.assertEquals(repr(error),
+                          "VdtTypeError('the value \"x\" is of the wrong type.')")
+        value = 'y' * (validate.ERROR_VALUE_LENGTH * 10)
+        error = validate.VdtValueTooLongError(value)
+        self.assertTrue(error.value is value)
+        self.assertTrue(len(str(error)) < validate.ERROR_VALUE_LENGTH + 30)
+        self.assertTrue('..." is too long.' in str(error))
+        error = pickle.loads(pickle.dumps(error))
+        self.assertEquals(error.value, value)
+        self.assertTrue('..." is too long.' in str(error))
+        error.args = ('replaced',)
+        self.assertEquals(str(error), 'replaced')
+        # subclasses keeping a value of their own keep their own message
+        class Mine(validate.VdtValueError):
+            def __init__(self, value):
+                validate.ValidateError.__init__(self, 'bad %s' % value)
+                self.value = value
+        error = Mine('v')
+        self.assertEquals((str(error), error.value), ('bad v', 'v'))
+        self.assertEquals(error.args, ('bad v',))
+
     def test_list_interpolation(self):
         c = ConfigObj()
         c['x'] = 'foo'
@@ -146,6 +146,9 @@ __all__ = (
     'VdtValueTooLongError',
     'VdtMissingValue',
     'Validator',
+    'CheckCache',
+    'CheckProfiler',
+    'ProfileReport',
     'is_integer',
     'is_float',
     'is_boolean',
@@ -165,7 +168,20 @@ __all__ = (
 
 
 
+import hashlib
+import heapq
+import os
 import re
+import reprlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# default number of compiled checks a Validator keeps
+CACHE_SIZE = 4096
+# longest value (in characters) shown in the message of a check error
+ERROR_VALUE_LENGTH = 200
 
 
 _list_arg = re.compile(r'''
@@ -312,6 +328,36 @@ def numToDottedQuad(num):
     except (socket.error, struct.error, OverflowError):
         raise ValueError('Not a good numeric IP: %s' % num)
 
+def _rebuild_error(cls, base, args, state):
+    """Unpickle an error without calling the ``__init__`` of ``cls``."""
+    error = cls.__new__(cls)
+    base.__init__(error, *args)
+    error.__dict__.update(state)
+    return error
+
+
+# shortens the containers shown in error messages
+_error_repr = reprlib.Repr()
+_error_repr.maxlevel = 3
+_error_repr.maxlist = _error_repr.maxtuple = _error_repr.maxdict = 50
+_error_repr.maxset = _error_repr.maxfrozenset = 50
+_error_repr.maxstring = _error_repr.maxlong = _error_repr.maxother = (
+    ERROR_VALUE_LENGTH)
+
+
+def _error_value(value):
+    """``value`` as shown in an error message, cut to ERROR_VALUE_LENGTH."""
+    if isinstance(value, str):
+        text = value[:ERROR_VALUE_LENGTH + 1]
+    elif isinstance(value, (list, tuple, dict, set, frozenset)):
+        text = _error_repr.repr(value)
+    else:
+        text = '%s' % (value,)
+    if len(text) > ERROR_VALUE_LENGTH:
+        text = text[:ERROR_VALUE_LENGTH - 3] + '...'
+    return text
+
+
 class ValidateError(Exception):
     """
     This error indicates that the check failed.
@@ -320,11 +366,58 @@ class ValidateError(Exception):
     Any check function that fails ought to raise this error.
     (or a subclass)
 
+    Subclasses that set ``_template`` are created with the failing
+    ``value``, which is kept as an attribute. Their message is only
+    formatted (with the value cut to ``ERROR_VALUE_LENGTH`` characters)
+    when it is asked for, by ``str``, ``repr`` or ``args``.
+
     >>> raise ValidateError
     Traceback (most recent call last):
     ValidateError
     """
 
+    # message of the errors created with a value: '... "%s" ...'
+    _template = None
+
+    def _set_value(self, value):
+        Exception.__init__(self)
+        self.value = value
+        # what the message is formatted with, kept apart from ``value`` so
+        # that subclasses setting ``value`` themselves keep their message
+        self._lazy_value = value
+
+    def _lazy(self):
+        return (self._template is not None and
+                '_lazy_value' in self.__dict__)
+
+    @property
+    def args(self):
+        if self._lazy():
+            return (self._template % (_error_value(self._lazy_value),),)
+        return BaseException.args.__get__(self)
+
+    @args.setter
+    def args(self, args):
+        self.__dict__.pop('_lazy_value', None)
+        BaseException.args.__set__(self, args)
+
+    def __str__(self):
+        if self._lazy():
+            return self.args[0]
+        return Exception.__str__(self)
+
+    def __repr__(self):
+        if self._lazy():
+            return '%s(%r)' % (self.__class__.__name__, self.args[0])
+        return Exception.__repr__(self)
+
+    def __reduce__(self):
+        # subclasses take the value rather than the message in __init__, so
+        # unpickling must not call it with the message
+        return _rebuild_error, (self.__class__, Exception,
+                                BaseException.args.__get__(self),
+                                self.__dict__)
+
 class VdtMissingValue(ValidateError):
     """No value was supplied to a check that needed one."""
 
@@ -332,13 +425,15 @@ class VdtMissingValue(ValidateError):
 class VdtUnknownCheckError(ValidateError):
     """An unknown check function was requested"""
 
+    _template = 'the check "%s" is unknown.'
+
     def __init__(self, value):
         """
         >>> raise VdtUnknownCheckError('yoda')
         Traceback (most recent call last):
         VdtUnknownCheckError: the check "yoda" is unknown.
         """
-        ValidateError.__init__(self, 'the check "%s" is unknown.' % (value,))
+        self._set_value(value)
 
 
 class VdtParamError(SyntaxError):
@@ -352,79 +447,318 @@ class VdtParamError(SyntaxError):
         """
         SyntaxError.__init__(self, 'passed an incorrect value "%s" for parameter "%s".' % (value, name))
 
+    def __reduce__(self):
+        return _rebuild_error, (self.__class__, SyntaxError, self.args,
+                                self.__dict__)
+
 
 class VdtTypeError(ValidateError):
     """The value supplied was of the wrong type"""
 
+    _template = 'the value "%s" is of the wrong type.'
+
     def __init__(self, value):
         """
         >>> raise VdtTypeError('jedi')
         Traceback (most recent call last):
         VdtTypeError: the value "jedi" is of the wrong type.
         """
-        ValidateError.__init__(self, 'the value "%s" is of the wrong type.' % (value,))
+        self._set_value(value)
 
 
 class VdtValueError(ValidateError):
     """The value supplied was of the correct type, but was not an allowed value."""
-    
+
+    _template = 'the value "%s" is unacceptable.'
+
     def __init__(self, value):
         """
         >>> raise VdtValueError('jedi')
         Traceback (most recent call last):
         VdtValueError: the value "jedi" is unacceptable.
         """
-        ValidateError.__init__(self, 'the value "%s" is unacceptable.' % (value,))
+        self._set_value(value)
 
 
 class VdtValueTooSmallError(VdtValueError):
     """The value supplied was of the correct type, but was too small."""
 
+    _template = 'the value "%s" is too small.'
+
     def __init__(self, value):
         """
         >>> raise VdtValueTooSmallError('0')
         Traceback (most recent call last):
         VdtValueTooSmallError: the value "0" is too small.
         """
-        ValidateError.__init__(self, 'the value "%s" is too small.' % (value,))
+        self._set_value(value)
 
 
 class VdtValueTooBigError(VdtValueError):
     """The value supplied was of the correct type, but was too big."""
 
+    _template = 'the value "%s" is too big.'
+
     def __init__(self, value):
         """
         >>> raise VdtValueTooBigError('1')
         Traceback (most recent call last):
         VdtValueTooBigError: the value "1" is too big.
         """
-        ValidateError.__init__(self, 'the value "%s" is too big.' % (value,))
+        self._set_value(value)
 
 
 class VdtValueTooShortError(VdtValueError):
     """The value supplied was of the correct type, but was too short."""
 
+    _template = 'the value "%s" is too short.'
+
     def __init__(self, value):
         """
         >>> raise VdtValueTooShortError('jed')
         Traceback (most recent call last):
         VdtValueTooShortError: the value "jed" is too short.
         """
-        ValidateError.__init__(
-            self,
-            'the value "%s" is too short.' % (value,))
+        self._set_value(value)
 
 
 class VdtValueTooLongError(VdtValueError):
     """The value supplied was of the correct type, but was too long."""
 
+    _template = 'the value "%s" is too long.'
+
     def __init__(self, value):
         """
         >>> raise VdtValueTooLongError('jedie')
         Traceback (most recent call last):
         VdtValueTooLongError: the value "jedie" is too long.
         """
-        ValidateError.__init__(self, 'the value "%s" is too long.' % (value,))
+        self._set_value(value)
+
+# marks a check without a default value
+_NO_DEFAULT = object()
+
+_CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class CheckCache(object):
+    """
+    A thread safe, least recently used cache of compiled checks.
+    
+    It holds at most ``maxsize`` checks (``None`` for no limit). One cache
+    can be shared by several Validator instances, in several threads, by
+    passing it as the ``cache`` argument. A check compiled by a validator
+    with a different function for it is compiled again, so sharing is most
+    useful between validators with the same ``functions``.
+    
+    >>> cache = CheckCache(2)
+    >>> vtor1 = Validator(cache=cache)
+    >>> vtor2 = Validator(cache=cache)
+    >>> vtor1.check('integer', '1'), vtor2.check('integer', '2')
+    (1, 2)
+    >>> vtor2.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        if maxsize is not None and maxsize < 0:
+            maxsize = 0
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def info(self):
+        """Return ``(hits, misses, maxsize, currsize)`` as a named tuple."""
+        with self._lock:
+            return _CacheInfo(self.hits, self.misses, self.maxsize,
+                              len(self._data))
+
+
+    def clear(self):
+        """Empty the cache and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    def __getstate__(self):
+        # compiled checks hold closures, so only the size survives pickling
+        return {'maxsize': self.maxsize}
+
+
+    def __setstate__(self, state):
+        self.__init__(state['maxsize'])
+
+
+_CheckStats = namedtuple('CheckStats', ['calls', 'failures', 'total', 'max'])
+
+
+class CheckProfiler(object):
+    """
+    Records how often each check of a Validator is applied and how long it
+    takes, while profiling is on (see ``Validator.enable_profiling``).
+    
+    ``ConfigObj.validate`` tells the profiler which ``(section path, key)``
+    it is checking with ``locate``, so that the slowest values can be
+    reported. It is safe to use from several threads.
+    """
+
+    def __init__(self, slowest=10, cache_info=None):
+        self.slowest = slowest
+        # check name -> [calls, failures, total, max]
+        self._stats = {}
+        # heap of the slowest (seconds, order, check, where)
+        self._heap = []
+        self._order = 0
+        self._cache_start = cache_info
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+
+    def locate(self, where):
+        """Set what the checks applied next (in this thread) are checking."""
+        self._local.where = where
+
+
+    def record(self, name, check, seconds, failed):
+        """Record that applying ``check`` took ``seconds``."""
+        where = getattr(self._local, 'where', None)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = [0, 0, 0.0, 0.0]
+            stats[0] += 1
+            if failed:
+                stats[1] += 1
+            stats[2] += seconds
+            if seconds > stats[3]:
+                stats[3] = seconds
+            if self.slowest:
+                self._order += 1
+                item = (seconds, self._order, check, where)
+                if len(self._heap) < self.slowest:
+                    heapq.heappush(self._heap, item)
+                elif item > self._heap[0]:
+                    heapq.heapreplace(self._heap, item)
+
+
+    def report(self, cache_info=None):
+        """
+        Return a ``ProfileReport`` of what was recorded. ``cache_info`` is
+        the current ``Validator.cache_info()``, to report the compiled check
+        cache hits since profiling started.
+        """
+        with self._lock:
+            checks = dict((name, _CheckStats(*stats))
+                          for name, stats in self._stats.items())
+            slowest = [(seconds, check, where) for (seconds, order, check,
+                       where) in sorted(self._heap, reverse=True)]
+        hits = misses = 0
+        if cache_info is not None and self._cache_start is not None:
+            hits = cache_info.hits - self._cache_start.hits
+            misses = cache_info.misses - self._cache_start.misses
+        return ProfileReport(checks, slowest, hits, misses)
+
+
+    def __getstate__(self):
+        # a copy (in another process, say) records for itself
+        return {'slowest': self.slowest}
+
+
+    def __setstate__(self, state):
+        self.__init__(state['slowest'])
+
+
+class ProfileReport(object):
+    """
+    What a ``CheckProfiler`` recorded.
+    
+    ``checks`` maps each check name to a named tuple of ``calls``,
+    ``failures``, ``total`` and ``max`` (times in seconds). ``slowest`` is
+    a list of ``(seconds, check, where)`` for the slowest checks applied,
+    slowest first, where ``where`` is the ``(section path, key)`` checked
+    (``None`` if it isn't known). ``cache_hits`` and ``cache_misses`` count
+    the lookups of compiled checks.
+    """
+
+    def __init__(self, checks, slowest, cache_hits, cache_misses):
+        self.checks = checks
+        self.slowest = slowest
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+
+
+    @property
+    def total(self):
+        """The time spent in all the checks."""
+        return sum(stats.total for stats in self.checks.values())
+
+
+    @property
+    def cache_hit_rate(self):
+        """The fraction of compiled check lookups found in the cache."""
+        lookups = self.cache_hits + self.cache_misses
+        if not lookups:
+            return 0.0
+        return self.cache_hits / float(lookups)
+
+
+    def __str__(self):
+        lines = ['%-20s %8s %8s %12s %12s' % (
+            'check', 'calls', 'failures', 'total (ms)', 'max (ms)')]
+        for name, stats in sorted(self.checks.items(),
+                                  key=lambda item: -item[1].total):
+            lines.append('%-20s %8d %8d %12.3f %12.3f' % (
+                name, stats.calls, stats.failures, stats.total * 1000,
+                stats.max * 1000))
+        if self.slowest:
+            lines.append('')
+            lines.append('slowest:')
+            for seconds, check, where in self.slowest:
+                if where is None:
+                    where = '?'
+                else:
+                    where = '/'.join(list(where[0]) + [where[1]])
+                lines.append('%12.3f ms  %s = %s' % (seconds * 1000, where,
+                                                      check))
+        lines.append('')
+        lines.append('compiled check cache: %d hits, %d misses (%.1f%%)' % (
+            self.cache_hits, self.cache_misses, self.cache_hit_rate * 100))
+        return '\n'.join(lines)
+
 
 class Validator(object):
     """
@@ -517,8 +851,11 @@ class Validator(object):
     _matchfinder = re.compile(_matchstring, re.VERBOSE | re.DOTALL)
 
 
-    def __init__(self, functions=None):
+    def __init__(self, functions=None, cache_size=CACHE_SIZE, cache=None):
         """
+        Compiled checks are kept in a ``CheckCache`` of ``cache_size``
+        checks (``None`` for no limit), or in ``cache`` if one is passed.
+        
         >>> vtri = Validator()
         """
         self.functions = {
@@ -544,7 +881,11 @@ class Validator(object):
             self.functions.update(functions)
         # tekNico: for use by ConfigObj
         self.baseErrorClass = ValidateError
-        self._cache = {}
+        if cache is None:
+            cache = CheckCache(cache_size)
+        self._cache = cache
+        # the CheckProfiler, while profiling is on
+        self.profiler = None
 
 
     def check(self, check, value, missing=False):
@@ -568,18 +909,204 @@ class Validator(object):
         >>> vtor.check('string(default="")', '', missing=True)
         ''
         """
-        fun_name, fun_args, fun_kwargs, default = self._parse_with_caching(check)
+        compiled = self._get_compiled(check)
+        if self.profiler is not None:
+            return self._profiled_check(compiled, check, value, missing)
             
         if missing:
-            if default is None:
+            if compiled.default is _NO_DEFAULT:
                 # no information needed here - to be handled by caller
                 raise VdtMissingValue()
-            value = self._handle_none(default)
+            return compiled.convert_default()
         
         if value is None:
             return None
         
-        return self._check_value(value, fun_name, fun_args, fun_kwargs)
+        return compiled.call(value)
+
+
+    def _profiled_check(self, compiled, check, value, missing):
+        failed = True
+        start = time.perf_counter()
+        try:
+            if missing:
+                if compiled.default is _NO_DEFAULT:
+                    raise VdtMissingValue()
+                result = compiled.convert_default()
+            elif value is None:
+                result = None
+            else:
+                result = compiled.call(value)
+            failed = False
+            return result
+        finally:
+            self.profiler.record(compiled.name, check,
+                                 time.perf_counter() - start, failed)
+
+
+    def enable_profiling(self, slowest=10):
+        """
+        Start recording the number of calls, failures, and total and longest
+        time of every check, along with the ``slowest`` slowest values
+        checked and the compiled check cache hits. Anything recorded before
+        is forgotten.
+        
+        Checks applied by the functions ``codegen`` generates, and in
+        another process, aren't recorded.
+        
+        >>> vtri = Validator()
+        >>> vtri.enable_profiling()
+        >>> vtri.check('integer', '1')
+        1
+        >>> vtri.profile_report().checks['integer'].calls
+        1
+        >>> vtri.disable_profiling()
+        """
+        self.profiler = CheckProfiler(slowest, self.cache_info())
+
+
+    def disable_profiling(self):
+        """Stop recording the time taken by the checks."""
+        self.profiler = None
+
+
+    def profile_report(self):
+        """
+        Return a ``ProfileReport`` of what has been recorded since
+        ``enable_profiling`` was called. Printing it gives a table of the
+        checks, slowest first.
+        """
+        if self.profiler is None:
+            raise ValueError('Profiling is not enabled.')
+        return self.profiler.report(self.cache_info())
+
+
+    def compile(self, configspec):
+        """
+        Compile every check in ``configspec`` ahead of validation.
+        
+        ``configspec`` is a mapping of check strings, which can contain
+        nested mappings (the ``configspec`` of a ConfigObj for example).
+        Each check is parsed once and bound to its check function, with
+        the ``min`` and ``max`` parameters of the built in checks
+        converted up front. ``check`` and ``get_default_value`` reuse the
+        compiled checks until their function is replaced in ``functions``.
+        
+        Returns the number of distinct checks compiled.
+        
+        >>> vtor.compile({'a': 'integer(0, 9)', 's': {'b': 'integer(0, 9)'}})
+        1
+        >>> vtor.check('integer(0, 9)', '3')
+        3
+        """
+        compiled = set()
+        stack = [configspec]
+        while stack:
+            section = stack.pop()
+            for key in section:
+                value = section[key]
+                if isinstance(value, dict):
+                    stack.append(value)
+                elif isinstance(value, str) and value not in compiled:
+                    compiled.add(value)
+                    self._compile_check(value)
+        return len(compiled)
+
+    def codegen(self, configspec, cache_file=None):
+        """
+        Generate a validation function specialized for ``configspec``.
+        
+        ``configspec`` is the configspec of a ConfigObj (a ConfigObj read
+        with ``_inspec=True``). The function returned is called as
+        ``validate(config, preserve_errors=False)``, setting
+        ``config.configspec`` to ``configspec`` and returning the same
+        results, with the same changes to ``config``, as
+        ``config.validate(validator, preserve_errors)``.
+        
+        The generated code walks the sections of ``configspec`` with every
+        check already looked up, and the ``integer``, ``float``,
+        ``boolean``, ``string``, ``option`` and ``pass`` checks written out
+        in place. A config it can't handle that way (one with a scalar where
+        the configspec has a section, for example) is passed on to
+        ``ConfigObj.validate``, as is every config when the configspec has
+        ``__many__`` members. The function uses the check functions of the
+        validator as they are when ``codegen`` is called.
+        
+        If ``cache_file`` is given the generated source is kept there, and
+        read back instead of generated again as long as ``configspec``, and
+        the checks that are written out in place, haven't changed.
+        """
+        generator = _Codegen(self, configspec)
+        fingerprint = generator.fingerprint()
+        source = None
+        if cache_file is not None:
+            try:
+                with open(cache_file) as h:
+                    source = h.read()
+            except (IOError, OSError):
+                pass
+            if (source is not None and source.split('\n')[1:2] !=
+                ['# fingerprint: %s' % fingerprint]):
+                source = None
+        if source is None:
+            source = generator.source(fingerprint)
+            if cache_file is not None:
+                _write_atomically(cache_file, source)
+        namespace = {}
+        code = compile(source, cache_file or '<codegen %s>' % fingerprint,
+                       'exec')
+        exec(code, namespace)
+        return namespace['make'](self, configspec, globals())
+
+
+
+    def cache_info(self):
+        """
+        Report the statistics of the compiled check cache, in the style of
+        ``functools.lru_cache``: ``(hits, misses, maxsize, currsize)``.
+        
+        >>> vtri = Validator(cache_size=10)
+        >>> vtri.check('integer', '1'), vtri.check('integer', '2')
+        (1, 2)
+        >>> vtri.cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=10, currsize=1)
+        """
+        return self._cache.info()
+
+
+    def cache_clear(self):
+        """Empty the compiled check cache and reset its statistics."""
+        self._cache.clear()
+
+
+    def _get_compiled(self, check):
+        compiled = self._cache.get(check)
+        if (compiled is None or
+            self.functions.get(compiled.name) is not compiled.function):
+            compiled = self._compile_check(check)
+        return compiled
+
+
+    def _compile_check(self, check):
+        fun_name, fun_args, fun_kwargs, default = self._parse_check(check)
+        fun_kwargs = dict([(str(key), value)
+                           for (key, value) in list(fun_kwargs.items())])
+        parsed = fun_name, tuple(fun_args), fun_kwargs, default
+        fun = self.functions.get(fun_name)
+        if fun is None:
+            def call(value):
+                raise VdtUnknownCheckError(fun_name)
+            pure = False
+        else:
+            call = _compile_call(fun, fun_args, fun_kwargs)
+            pure = fun in _PURE_CHECKS or fun == self._pass
+        if default is None:
+            default = _NO_DEFAULT
+        else:
+            default = self._handle_none(default)
+        compiled = _CompiledCheck(parsed, fun, call, default, pure)
+        self._cache[check] = compiled
+        return compiled
 
 
     def _handle_none(self, value):
@@ -591,29 +1118,6 @@ class Validator(object):
         return value
 
 
-    def _parse_with_caching(self, check):
-        if check in self._cache:
-            fun_name, fun_args, fun_kwargs, default = self._cache[check]
-            # We call list and dict below to work with *copies* of the data
-            # rather than the original (which are mutable of course)
-            fun_args = list(fun_args)
-            fun_kwargs = dict(fun_kwargs)
-        else:
-            fun_name, fun_args, fun_kwargs, default = self._parse_check(check)
-            fun_kwargs = dict([(str(key), value) for (key, value) in list(fun_kwargs.items())])
-            self._cache[check] = fun_name, list(fun_args), dict(fun_kwargs), default
-        return fun_name, fun_args, fun_kwargs, default
-        
-        
-    def _check_value(self, value, fun_name, fun_args, fun_kwargs):
-        try:
-            fun = self.functions[fun_name]
-        except KeyError:
-            raise VdtUnknownCheckError(fun_name)
-        else:
-            return fun(value, *fun_args, **fun_kwargs)
-
-
     def _parse_check(self, check):
         fun_match = self._func_re.match(check)
         if fun_match:
@@ -671,7 +1175,8 @@ class Validator(object):
         return name, out
 
 
-    def _pass(self, value):
+    @staticmethod
+    def _pass(value):
         """
         Dummy check that always passes
         
@@ -691,13 +1196,10 @@ class Validator(object):
         If the check doesn't specify a default value then a
         ``KeyError`` will be raised.
         """
-        fun_name, fun_args, fun_kwargs, default = self._parse_with_caching(check)
-        if default is None:
+        compiled = self._get_compiled(check)
+        if compiled.default is _NO_DEFAULT:
             raise KeyError('Check "%s" has no default value.' % check)
-        value = self._handle_none(default)
-        if value is None:
-            return value
-        return self._check_value(value, fun_name, fun_args, fun_kwargs)
+        return compiled.convert_default()
 
 def _is_num_param(names, values, to_float=False):
     """
@@ -776,6 +1278,9 @@ def is_integer(value, min=None, max=None):
     0
     """
     (min_val, max_val) = _is_num_param(('min', 'max'), (min, max))
+    return _is_integer(value, min_val, max_val)
+
+def _is_integer(value, min_val, max_val):
     if not isinstance(value, (int, int, str)):
         raise VdtTypeError(value)
     if isinstance(value, str):
@@ -827,6 +1332,9 @@ def is_float(value, min=None, max=None):
     """
     (min_val, max_val) = _is_num_param(
         ('min', 'max'), (min, max), to_float=True)
+    return _is_float(value, min_val, max_val)
+
+def _is_float(value, min_val, max_val):
     if not isinstance(value, (int, int, float, str)):
         raise VdtTypeError(value)
     if not isinstance(value, float):
@@ -973,6 +1481,9 @@ def is_list(value, min=None, max=None):
     VdtTypeError: the value "12" is of the wrong type.
     """
     (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_list(value, min_len, max_len)
+
+def _is_list(value, min_len, max_len):
     if isinstance(value, str):
         raise VdtTypeError(value)
     try:
@@ -1017,7 +1528,10 @@ def is_tuple(value, min=None, max=None):
     VdtTypeError: the value "12" is of the wrong type.
     """
     return tuple(is_list(value, min, max))
-    
+
+def _is_tuple(value, min_len, max_len):
+    return tuple(_is_list(value, min_len, max_len))
+
 def is_string(value, min=None, max=None):
     """
     Check that the supplied value is a string.
@@ -1043,6 +1557,11 @@ def is_string(value, min=None, max=None):
     if not isinstance(value, str):
         raise VdtTypeError(value)
     (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_string(value, min_len, max_len)
+
+def _is_string(value, min_len, max_len):
+    if not isinstance(value, str):
+        raise VdtTypeError(value)
     try:
         num_members = len(value)
     except TypeError:
@@ -1054,6 +1573,13 @@ def is_string(value, min=None, max=None):
     return value
 
 
+# member types the list checks convert all at once, with the same result as
+# checking each member
+_INT_MEMBER_TYPES = frozenset((int, str))
+_FLOAT_MEMBER_TYPES = frozenset((bool, int, float, str))
+_STR_MEMBER_TYPES = frozenset((str,))
+
+
 def is_int_list(value, min=None, max=None):
     """
     Check that the value is a list of integers.
@@ -1074,7 +1600,19 @@ def is_int_list(value, min=None, max=None):
     Traceback (most recent call last):
     VdtTypeError: the value "a" is of the wrong type.
     """
-    return [is_integer(mem) for mem in is_list(value, min, max)]
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_int_list(value, min_len, max_len)
+
+def _is_int_list(value, min_len, max_len):
+    value = _is_list(value, min_len, max_len)
+    if set(map(type, value)) <= _INT_MEMBER_TYPES:
+        # convert every member in one go, checking them one at a time only
+        # to report the first that fails
+        try:
+            return list(map(int, value))
+        except ValueError:
+            pass
+    return [_is_integer(mem, None, None) for mem in value]
 
 
 def is_bool_list(value, min=None, max=None):
@@ -1099,7 +1637,17 @@ def is_bool_list(value, min=None, max=None):
     Traceback (most recent call last):
     VdtTypeError: the value "a" is of the wrong type.
     """
-    return [is_boolean(mem) for mem in is_list(value, min, max)]
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_bool_list(value, min_len, max_len)
+
+def _is_bool_list(value, min_len, max_len):
+    value = _is_list(value, min_len, max_len)
+    if set(map(type, value)) <= _STR_MEMBER_TYPES:
+        try:
+            return [bool_dict[mem.lower()] for mem in value]
+        except KeyError:
+            pass
+    return [is_boolean(mem) for mem in value]
 
 
 def is_float_list(value, min=None, max=None):
@@ -1122,7 +1670,17 @@ def is_float_list(value, min=None, max=None):
     Traceback (most recent call last):
     VdtTypeError: the value "a" is of the wrong type.
     """
-    return [is_float(mem) for mem in is_list(value, min, max)]
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_float_list(value, min_len, max_len)
+
+def _is_float_list(value, min_len, max_len):
+    value = _is_list(value, min_len, max_len)
+    if set(map(type, value)) <= _FLOAT_MEMBER_TYPES:
+        try:
+            return list(map(float, value))
+        except ValueError:
+            pass
+    return [_is_float(mem, None, None) for mem in value]
 
 def is_string_list(value, min=None, max=None):
     """
@@ -1147,7 +1705,14 @@ def is_string_list(value, min=None, max=None):
     """
     if isinstance(value, str):
         raise VdtTypeError(value)
-    return [is_string(mem) for mem in is_list(value, min, max)]
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_string_list(value, min_len, max_len)
+
+def _is_string_list(value, min_len, max_len):
+    if isinstance(value, str):
+        raise VdtTypeError(value)
+    return [_is_string(mem, None, None)
+            for mem in _is_list(value, min_len, max_len)]
 
 def is_ip_addr_list(value, min=None, max=None):
     """
@@ -1167,7 +1732,11 @@ def is_ip_addr_list(value, min=None, max=None):
     Traceback (most recent call last):
     VdtValueError: the value "a" is unacceptable.
     """
-    return [is_ip_addr(mem) for mem in is_list(value, min, max)]
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _is_ip_addr_list(value, min_len, max_len)
+
+def _is_ip_addr_list(value, min_len, max_len):
+    return [is_ip_addr(mem) for mem in _is_list(value, min_len, max_len)]
 
 def force_list(value, min=None, max=None):
     """
@@ -1186,9 +1755,13 @@ def force_list(value, min=None, max=None):
     >>> vtor.check('force_list', 'hello')
     ['hello']
     """
+    (min_len, max_len) = _is_num_param(('min', 'max'), (min, max))
+    return _force_list(value, min_len, max_len)
+
+def _force_list(value, min_len, max_len):
     if not isinstance(value, (list, tuple)):
         value = [value]
-    return is_list(value, min, max)
+    return _is_list(value, min_len, max_len)
 
 fun_dict = {
     'integer': is_integer,
@@ -1286,6 +1859,501 @@ def is_option(value, *options):
         raise VdtValueError(value)
     return value
 
+# built in checks taking ``min`` and ``max`` that Validator.compile can
+# bind to already converted parameters: (implementation, to_float)
+_MIN_MAX_CHECKS = {
+    is_integer: (_is_integer, False),
+    is_float: (_is_float, True),
+    is_list: (_is_list, False),
+    is_tuple: (_is_tuple, False),
+    is_string: (_is_string, False),
+    is_int_list: (_is_int_list, False),
+    is_bool_list: (_is_bool_list, False),
+    is_float_list: (_is_float_list, False),
+    is_string_list: (_is_string_list, False),
+    is_ip_addr_list: (_is_ip_addr_list, False),
+    force_list: (_force_list, False),
+}
+
+# built in checks without side effects, whose converted defaults can be kept
+_PURE_CHECKS = frozenset(list(_MIN_MAX_CHECKS) + [
+    is_boolean, is_ip_addr, is_mixed_list, is_option])
+
+# converted defaults of these types are kept (lists are handed out as copies)
+_KEEP_DEFAULT_TYPES = (bool, int, float, str, tuple, list)
+
+
+def _bind_min_max(args, kwargs):
+    """
+    Return the ``[min, max]`` a ``(value, min=None, max=None)`` check
+    would be called with, or ``None`` if the call would not bind.
+    """
+    if len(args) > 2 or set(kwargs) - set(('min', 'max')):
+        return None
+    params = list(args) + [None] * (2 - len(args))
+    for index, name in enumerate(('min', 'max')):
+        if name in kwargs:
+            if index < len(args):
+                return None
+            params[index] = kwargs[name]
+    return params
+
+
+def _compile_call(fun, args, kwargs):
+    """Return a callable applying ``fun`` and its parameters to a value."""
+    try:
+        fast = _MIN_MAX_CHECKS.get(fun)
+    except TypeError:
+        # unhashable check function
+        fast = None
+    if fast is not None:
+        params = _bind_min_max(args, kwargs)
+        if params is not None:
+            implementation, to_float = fast
+            try:
+                (min_val, max_val) = _is_num_param(
+                    ('min', 'max'), params, to_float=to_float)
+            except VdtParamError:
+                # leave the error to be raised by the check itself
+                pass
+            else:
+                return lambda value: implementation(value, min_val, max_val)
+    if not args and not kwargs:
+        return fun
+    args = tuple(args)
+    return lambda value: fun(value, *args, **kwargs)
+
+
+class _CompiledCheck(object):
+    """A check string parsed once and bound to its check function."""
+
+    __slots__ = ('parsed', 'name', 'function', 'call', 'default', 'pure',
+                 '_converted')
+
+    def __init__(self, parsed, function, call, default, pure):
+        # (fun_name, fun_args, fun_kwargs, default) as parsed
+        self.parsed = parsed
+        self.name = parsed[0]
+        self.function = function
+        self.call = call
+        # the unconverted default (``None`` meaning the ``None`` object)
+        self.default = default
+        self.pure = pure
+        self._converted = _NO_DEFAULT
+
+
+    def convert_default(self):
+        value = self._converted
+        if value is not _NO_DEFAULT:
+            if type(value) is list:
+                value = list(value)
+            return value
+        value = self.default
+        if value is None:
+            return None
+        value = self.call(value)
+        if self.pure and type(value) in _KEEP_DEFAULT_TYPES:
+            self._converted = value
+            if type(value) is list:
+                value = list(value)
+        return value
+
+
+# bump when the code ``Validator.codegen`` generates changes, so that cached
+# code from an older version is generated again
+CODEGEN_VERSION = 3
+
+# built in checks ``Validator.codegen`` writes out in the generated code
+_INLINE_CHECKS = {
+    is_integer: 'integer',
+    is_float: 'float',
+    is_boolean: 'boolean',
+    is_string: 'string',
+    is_option: 'option',
+    Validator._pass: 'pass',
+}
+
+
+def _literal(value):
+    """Is ``value`` written the same by ``repr`` and read back by Python ?"""
+    if type(value) is float:
+        return value == value and value not in (float('inf'), float('-inf'))
+    return value is None or type(value) in (int, str)
+
+
+def _inline_check(kind, args, kwargs):
+    """
+    Return the lines of code for the built in check ``kind``, setting
+    ``check`` from ``val`` exactly as the check does, or ``None`` if its
+    parameters would need the check itself (to raise the error, say).
+    """
+    if kind in ('boolean', 'pass'):
+        if args or kwargs:
+            return None
+        if kind == 'pass':
+            return ['check = val']
+        return [
+            'if isinstance(val, str):',
+            '    try:',
+            '        check = bool_dict[val.lower()]',
+            '    except KeyError:',
+            '        raise VdtTypeError(val)',
+            'elif val == False:',
+            '    check = False',
+            'elif val == True:',
+            '    check = True',
+            'else:',
+            '    raise VdtTypeError(val)',
+        ]
+    if kind == 'option':
+        if kwargs or not all(type(arg) is str for arg in args):
+            return None
+        return [
+            'if not isinstance(val, str):',
+            '    raise VdtTypeError(val)',
+            'if val not in %r:' % (tuple(args),),
+            '    raise VdtValueError(val)',
+            'check = val',
+        ]
+    params = _bind_min_max(args, kwargs)
+    if params is None:
+        return None
+    try:
+        (min_val, max_val) = _is_num_param(
+            ('min', 'max'), params, to_float=(kind == 'float'))
+    except VdtParamError:
+        return None
+    if not (_literal(min_val) and _literal(max_val)):
+        return None
+    if kind == 'string':
+        lines = [
+            'if not isinstance(val, str):',
+            '    raise VdtTypeError(val)',
+        ]
+        if min_val is not None:
+            lines += ['if len(val) < %r:' % min_val,
+                      '    raise VdtValueTooShortError(val)']
+        if max_val is not None:
+            lines += ['if len(val) > %r:' % max_val,
+                      '    raise VdtValueTooLongError(val)']
+        return lines + ['check = val']
+    if kind == 'integer':
+        lines = [
+            'if isinstance(val, str):',
+            '    try:',
+            '        check = int(val)',
+            '    except ValueError:',
+            '        raise VdtTypeError(val)',
+            'elif isinstance(val, int):',
+            '    check = val',
+            'else:',
+            '    raise VdtTypeError(val)',
+        ]
+    else:
+        lines = [
+            'if isinstance(val, float):',
+            '    check = val',
+            'elif isinstance(val, (int, str)):',
+            '    try:',
+            '        check = float(val)',
+            '    except ValueError:',
+            '        raise VdtTypeError(val)',
+            'else:',
+            '    raise VdtTypeError(val)',
+        ]
+    if min_val is not None:
+        lines += ['if check < %r:' % min_val,
+                  '    raise VdtValueTooSmallError(check)']
+    if max_val is not None:
+        lines += ['if check > %r:' % max_val,
+                  '    raise VdtValueTooBigError(check)']
+    return lines
+
+
+def _write_atomically(filename, text):
+    """Replace ``filename`` with ``text``, without leaving it half written."""
+    directory, name = os.path.split(os.path.abspath(filename))
+    fd, temp = tempfile.mkstemp(prefix='.%s.' % name, dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as h:
+            h.write(text)
+        os.replace(temp, filename)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class _Codegen(object):
+    """
+    Writes the source of the validation function ``Validator.codegen``
+    returns, for one configspec.
+    
+    The source defines ``make(validator, configspec, names)``, which binds
+    the compiled checks and the sections of ``configspec`` and returns the
+    function.
+    """
+
+    def __init__(self, validator, configspec):
+        self.validator = validator
+        # (index, path, spec section) for every section, parents first
+        self.sections = []
+        # spec string -> index of its compiled check
+        self.checks = {}
+        self.supported = True
+        stack = [((), configspec)]
+        while stack:
+            path, section = stack.pop()
+            self.sections.append((len(self.sections), path, section))
+            if ('__many__' in section or '___many___' in section or
+                (not path and 'DEFAULT' in section)):
+                # validated against the members the config happens to have
+                self.supported = False
+            for key in section.scalars:
+                spec = section[key]
+                if not isinstance(spec, str):
+                    self.supported = False
+                elif spec not in self.checks:
+                    self.checks[spec] = len(self.checks)
+            for key in reversed(section.sections):
+                stack.append((path + (key,), section[key]))
+        self.index = dict((path, index)
+                          for (index, path, section) in self.sections)
+
+
+    def inline(self, spec):
+        """The ``_inline_check`` lines for ``spec``, if it can be inlined."""
+        fun_name, args, kwargs, default = self.validator._parse_check(spec)
+        kind = _INLINE_CHECKS.get(self.validator.functions.get(fun_name))
+        if kind is None:
+            return None
+        return _inline_check(kind, args, kwargs)
+
+
+    def has_default(self, spec):
+        return self.validator._get_compiled(spec).default is not _NO_DEFAULT
+
+
+    def fingerprint(self):
+        """
+        A hash of everything the generated source depends on: the shape of
+        the configspec, its checks and which of them are inlined.
+        """
+        parts = [CODEGEN_VERSION, self.supported]
+        for index, path, section in self.sections:
+            parts.append((path, list(section.sections)))
+            for key in section.scalars:
+                spec = section[key]
+                if isinstance(spec, str):
+                    parts.append((key, spec, self.inline(spec)))
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+    def source(self, fingerprint):
+        lines = [
+            '# Generated by validate.Validator.codegen - do not edit.',
+            '# fingerprint: %s' % fingerprint,
+            '',
+            'def make(validator, configspec, names):',
+        ]
+        body = []
+        if self.supported:
+            self._write_make(body)
+        else:
+            body += [
+                'def validate(config, preserve_errors=False):',
+                '    config.configspec = configspec',
+                '    return config.validate(validator, preserve_errors)',
+            ]
+        body.append('return validate')
+        lines += [line and '    ' + line for line in body]
+        return '\n'.join(lines) + '\n'
+
+
+    def _write_make(self, body):
+        body += [
+            'BaseError = validator.baseErrorClass',
+            "bool_dict = names['bool_dict']",
+        ]
+        for name in ('VdtMissingValue', 'VdtTypeError', 'VdtValueError',
+                     'VdtValueTooSmallError', 'VdtValueTooBigError',
+                     'VdtValueTooShortError', 'VdtValueTooLongError'):
+            body.append('%s = names[%r]' % (name, name))
+        body.append('compiled = validator._get_compiled')
+        for spec, index in sorted(self.checks.items(), key=lambda x: x[1]):
+            body.append('K%d = compiled(%r)' % (index, spec))
+            if self.inline(spec) is None:
+                body.append('C%d = K%d.call' % (index, index))
+            if self.has_default(spec):
+                body.append('M%d = K%d.convert_default' % (index, index))
+        for index, path, section in self.sections:
+            if path:
+                parent = self.index[path[:-1]]
+                body.append('spec%d = spec%d[%r]' % (index, parent, path[-1]))
+            else:
+                body.append('spec%d = configspec' % index)
+            body.append('keys%d = frozenset(%r)' % (
+                index, tuple(section.scalars + section.sections)))
+            body.append('scalars%d = frozenset(%r)' % (
+                index, tuple(section.scalars)))
+        for index, path, section in self.sections:
+            body.append('')
+            self._write_shape(body, index, path, section)
+            body.append('')
+            self._write_section(body, index, path, section)
+        body.append('')
+        for index, path, section in self.sections:
+            body.append('children%d = {%s}' % (index, ', '.join(
+                '%r: section%d' % (key, self.index[path + (key,)])
+                for key in section.sections)))
+        body += [
+            '',
+            'def validate(config, preserve_errors=False):',
+            '    config.configspec = configspec',
+            '    if not config.stringify or not shape0(config):',
+            '        return config.validate(validator, preserve_errors)',
+            '    if preserve_errors:',
+            '        config._vdtMissingValue = VdtMissingValue',
+            '    return section0(config, preserve_errors, config)',
+        ]
+
+
+    def _write_shape(self, body, index, path, section):
+        """
+        ``shape<index>(s)``: is ``s`` (and what is below it) shaped so
+        that the generated code validates it like ``ConfigObj.validate`` ?
+        """
+        extra = 'key not in children%d' % index
+        if not path:
+            extra += " and key != 'DEFAULT'"
+        body += [
+            'def shape%d(s):' % index,
+            '    sections = s.sections',
+            '    for key in sections:',
+            '        if key in scalars%d:' % index,
+            '            return False',
+            '        if %s and s[key].configspec is not None:' % extra,
+            '            return False',
+        ]
+        for key in section.sections:
+            body += [
+                '    if %r in s:' % key,
+                '        if (%r not in sections or not shape%d(s[%r])):' % (
+                    key, self.index[path + (key,)], key),
+                '            return False',
+            ]
+        body.append('    return True')
+
+
+    def _write_section(self, body, index, path, section):
+        """``section<index>(s, preserve_errors, main)``: validate ``s``."""
+        body += [
+            'def section%d(s, preserve_errors, main):' % index,
+            '    out = {}',
+            '    ret_true = True',
+            '    ret_false = True',
+        ]
+        for key in section.sections:
+            body += [
+                '    if %r not in s:' % key,
+                '        s[%r] = {}' % key,
+                '        s[%r]._created = True' % key,
+                '    s[%r].configspec = spec%d' % (
+                    key, self.index[path + (key,)]),
+            ]
+        body += [
+            '    if s._virtual_defaults is not None:',
+            '        s.default_values = dict(s.default_values)',
+            '        s._virtual_defaults = None',
+            '    unvalidated = [k for k in s.scalars if k not in keys%d]' % (
+                index),
+            '    default_values = s.default_values',
+            '    defaults = s.defaults',
+        ]
+        for key in section.scalars:
+            self._write_scalar(body, key, section[key])
+        body += [
+            '    for key in s.sections:',
+            '        child = children%d.get(key)' % index,
+            '        if child is None:',
+        ]
+        if not path:
+            body += [
+                "            if key == 'DEFAULT':",
+                '                continue',
+            ]
+        body += [
+            '            unvalidated.append(key)',
+            '            continue',
+            '        check = child(s[key], preserve_errors, main)',
+            '        out[key] = check',
+            '        if check == False:',
+            '            ret_true = False',
+            '        elif check == True:',
+            '            ret_false = False',
+            '        else:',
+            '            ret_true = False',
+            '    return main._validate_result(s, unvalidated, out, ret_true,',
+            '                                 ret_false, preserve_errors)',
+        ]
+
+
+    def _write_scalar(self, body, key, spec):
+        index = self.checks[spec]
+        has_default = self.has_default(spec)
+        body += [
+            '    # %r: %r' % (key, spec),
+            '    if %r in s and %r not in defaults:' % (key, key),
+            '        missing = False',
+            '        val = s[%r]' % key,
+            '    else:',
+            '        missing = True',
+            '    default_values.pop(%r, None)' % key,
+        ]
+        if has_default:
+            body += [
+                '    try:',
+                '        default_values[%r] = M%d()' % (key, index),
+                '    except (KeyError, AttributeError, BaseError):',
+                '        pass',
+            ]
+        body += [
+            '    try:',
+            '        if missing:',
+            ('            check = M%d()' % index if has_default else
+             '            raise VdtMissingValue()'),
+            '        elif val is None:',
+            '            check = None',
+            '        else:',
+        ]
+        lines = self.inline(spec)
+        if lines is None:
+            lines = ['check = C%d(val)' % index]
+        body += ['            ' + line for line in lines]
+        body += [
+            '    except BaseError as e:',
+            '        ret_true = False',
+            '        if not preserve_errors or isinstance(e, VdtMissingValue):',
+            '            out[%r] = False' % key,
+            '        else:',
+            '            out[%r] = e' % key,
+            '            ret_false = False',
+            '    else:',
+            '        ret_false = False',
+            '        out[%r] = True' % key,
+            '        if missing:',
+            '            s[%r] = check' % key,
+            '            if %r not in defaults:' % key,
+            '                defaults.append(%r)' % key,
+            '        elif check != val:',
+            '            span = s._spans.get(%r)' % key,
+            '            raw = dict.get(s, %r)' % key,
+            '            s[%r] = check' % key,
+            '            if span is not None and main._same_text(check, raw):',
+            '                s._spans[%r] = span' % key,
+        ]
+
+
 def _test(value, *args, **keywargs):
     """
     A function that exists for test purposes.